@@ -0,0 +1,98 @@
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import DEFERRED
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+CLAIMS_FIELDS = ('username', 'role', 'is_staff')
+CLAIMS_VERSION_CLAIM = 'claims_version'
+CLAIMS_VERSION_KEY = 'jwt_claims_version:{user_id}'
+# Общая часть версии всех пользователей, сбрасывается после массового
+# изменения пользователей в обход save().
+CLAIMS_EPOCH_KEY = 'jwt_claims_epoch'
+
+
+def get_current_claims_version(user_id):
+    """Возвращает версию из кеша или None, если она сброшена."""
+    keys = (CLAIMS_EPOCH_KEY, CLAIMS_VERSION_KEY.format(user_id=user_id))
+    versions = cache.get_many(keys)
+    if len(versions) < len(keys):
+        return None
+    return ':'.join(versions[key] for key in keys)
+
+
+def get_claims_version(user_id):
+    """Возвращает текущую версию данных пользователя в токенах."""
+    key = CLAIMS_VERSION_KEY.format(user_id=user_id)
+    timeout = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    cache.add(CLAIMS_EPOCH_KEY, uuid.uuid4().hex, timeout=None)
+    cache.add(key, uuid.uuid4().hex, timeout=timeout)
+    cache.touch(key, timeout=timeout)
+    return get_current_claims_version(user_id)
+
+
+def revoke_claims(user_id):
+    """Делает устаревшими данные пользователя во всех выпущенных токенах."""
+    cache.delete(CLAIMS_VERSION_KEY.format(user_id=user_id))
+
+
+def revoke_all_claims():
+    """Делает устаревшими данные всех пользователей в выпущенных токенах."""
+    cache.delete(CLAIMS_EPOCH_KEY)
+
+
+def get_access_token(user):
+    """Выпускает access-токен с данными пользователя для проверки прав."""
+    token = RefreshToken.for_user(user).access_token
+    for field in CLAIMS_FIELDS:
+        token[field] = getattr(user, field)
+    token[CLAIMS_VERSION_CLAIM] = get_claims_version(user.pk)
+    return token
+
+
+class JWTClaimsAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса пользователя к базе данных.
+
+    При включенной настройке `JWT_CLAIMS_AUTH` пользователь собирается из
+    данных токена, остальные поля модели загружаются только при обращении
+    к ним. Токены без этих данных или с устаревшей версией (пользователь
+    изменен после выпуска токена) проверяются запросом к базе данных.
+    """
+
+    def has_fresh_claims(self, validated_token):
+        if not settings.JWT_CLAIMS_AUTH or any(
+            claim not in validated_token
+            for claim in (*CLAIMS_FIELDS, CLAIMS_VERSION_CLAIM)
+        ):
+            return False
+        return validated_token[CLAIMS_VERSION_CLAIM] == (
+            get_current_claims_version(
+                validated_token[api_settings.USER_ID_CLAIM]
+            )
+        )
+
+    def get_user(self, validated_token):
+        if not self.has_fresh_claims(validated_token):
+            return super().get_user(validated_token)
+        claims = {
+            field: validated_token[field] for field in CLAIMS_FIELDS
+        }
+        claims[api_settings.USER_ID_FIELD] = validated_token[
+            api_settings.USER_ID_CLAIM
+        ]
+        claims['is_active'] = True
+        return User.from_db(
+            DEFAULT_DB_ALIAS,
+            tuple(claims),
+            [
+                claims.get(field.attname, DEFERRED)
+                for field in User._meta.concrete_fields
+            ],
+        )
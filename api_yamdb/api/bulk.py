@@ -0,0 +1,153 @@
+"""Массовое создание и изменение произведений."""
+from django.db import connection, transaction
+
+from api.serializers import TitleBulkSerializer
+from reviews import models, slug_cache
+from reviews.search import update_search_indexes
+from reviews.signals import bulk_changed
+
+CREATED = 'created'
+UPDATED = 'updated'
+INVALID = 'invalid'
+SKIPPED = 'skipped'
+UNKNOWN_CATEGORY_ERROR = 'Категории {slug} не существует.'
+UNKNOWN_GENRE_ERROR = 'Жанров {slugs} не существует.'
+UNKNOWN_TITLE_ERROR = 'Произведения с id {id} не существует.'
+DUPLICATE_TITLE_ERROR = 'Произведение с id {id} уже изменяет элемент {index}.'
+TITLE_FIELDS = ('name', 'year', 'description', 'category')
+
+
+def get_slug_ids(model, slugs):
+    if slug_cache.is_enabled():
+        return slug_cache.NAME_SLUG_CACHES[model].get_ids(slugs)
+    return dict(
+        model.objects.filter(slug__in=slugs).values_list('slug', 'pk')
+    )
+
+
+def mark_duplicate_ids(data, errors):
+    """Отмечает ошибкой повторные элементы с уже встречавшимся id."""
+    indexes = {}
+    for index, (item, error) in enumerate(zip(data, errors)):
+        if error or 'id' not in item:
+            continue
+        if item['id'] in indexes:
+            error['id'] = [DUPLICATE_TITLE_ERROR.format(
+                id=item['id'], index=indexes[item['id']]
+            )]
+        else:
+            indexes[item['id']] = index
+
+
+def validate_titles(items):
+    """Проверяет произведения и возвращает их данные и ошибки.
+
+    Категории, жанры и изменяемые произведения всех элементов
+    получаются из базы тремя запросами.
+    """
+    serializers = [TitleBulkSerializer(data=item) for item in items]
+    errors = [
+        {} if serializer.is_valid() else serializer.errors
+        for serializer in serializers
+    ]
+    data = [serializer.validated_data for serializer in serializers]
+    mark_duplicate_ids(data, errors)
+    valid_data = [item for item, error in zip(data, errors) if not error]
+    categories = get_slug_ids(
+        models.Category, {item['category'] for item in valid_data}
+    )
+    genres = get_slug_ids(
+        models.Genre, {slug for item in valid_data for slug in item['genre']}
+    )
+    titles = models.Title.objects.in_bulk(
+        {item['id'] for item in valid_data if 'id' in item}
+    )
+    for item, error in zip(data, errors):
+        if error:
+            continue
+        if item['category'] not in categories:
+            error['category'] = [
+                UNKNOWN_CATEGORY_ERROR.format(slug=item['category'])
+            ]
+        unknown_genres = [
+            slug for slug in item['genre'] if slug not in genres
+        ]
+        if unknown_genres:
+            error['genre'] = [
+                UNKNOWN_GENRE_ERROR.format(slugs=', '.join(unknown_genres))
+            ]
+        if 'id' in item and item['id'] not in titles:
+            error['id'] = [UNKNOWN_TITLE_ERROR.format(id=item['id'])]
+    return data, errors, categories, genres, titles
+
+
+def bulk_create_titles(titles):
+    """Создает произведения и заполняет их id.
+
+    SQLite в Django 3.2 не возвращает id созданных записей, поэтому они
+    читаются после вставки: внутри транзакции SQLite других записей
+    в таблицу не добавляется, и новые записи получают наибольшие id.
+    На остальных СУБД без возврата id произведения сохраняются по одному.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        models.Title.objects.bulk_create(titles)
+    elif connection.vendor == 'sqlite':
+        models.Title.objects.bulk_create(titles)
+        ids = models.Title.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        )[:len(titles)]
+        for title, pk in zip(titles, reversed(ids)):
+            title.pk = pk
+            title._state.adding = False
+            title._state.db = connection.alias
+    else:
+        for title in titles:
+            title.save()
+
+
+def save_titles(items, partial_success=False):
+    """Создает и изменяет произведения одной транзакцией.
+
+    Элементы с id изменяют существующие произведения, остальные создают
+    новые. Если partial_success не задан, при ошибке в любом элементе
+    ничего не сохраняется. Возвращает результат для каждого элемента.
+    """
+    data, errors, categories, genres, titles = validate_titles(items)
+    results = [
+        {'status': INVALID, 'errors': error} if error
+        else {'status': SKIPPED}
+        for error in errors
+    ]
+    if any(errors) and not partial_success:
+        return results
+    new_titles, updated_titles, title_genres = [], [], []
+    for index, item in enumerate(data):
+        if errors[index]:
+            continue
+        title = titles[item['id']] if 'id' in item else models.Title()
+        title.name = item['name']
+        title.year = item['year']
+        title.description = item.get('description', title.description)
+        title.category_id = categories[item['category']]
+        (updated_titles if 'id' in item else new_titles).append(title)
+        title_genres.append((index, title, item['genre']))
+    through = models.Title.genre.through
+    with transaction.atomic():
+        if new_titles:
+            bulk_create_titles(new_titles)
+        models.Title.objects.bulk_update(updated_titles, TITLE_FIELDS)
+        through.objects.filter(title__in=updated_titles).delete()
+        through.objects.bulk_create(
+            through(title_id=title.pk, genre_id=genres[slug])
+            for _, title, slugs in title_genres
+            for slug in dict.fromkeys(slugs)
+        )
+        update_search_indexes(models.TitleSearchIndex, new_titles, True)
+        update_search_indexes(models.TitleSearchIndex, updated_titles)
+        bulk_changed.send(sender=models.Title)
+    for index, title, _ in title_genres:
+        results[index] = {
+            'status': UPDATED if 'id' in data[index] else CREATED,
+            'id': title.pk,
+        }
+    return results
@@ -0,0 +1,188 @@
+"""Кеширование и условные запросы ответов API с версиями ресурсов.
+
+Версия ресурса - пара (uuid, время изменения) в кеше Django. Запись
+моделей ресурса заменяет версию, поэтому ETag, Last-Modified и ключ
+кешированного ответа вычисляются без запросов к базе данных.
+Last-Modified хранит время с точностью до секунды, поэтому версия,
+измененная в текущую секунду, проверяется только по ETag: следующее
+изменение в ту же секунду не изменило бы Last-Modified.
+"""
+import hashlib
+import time
+import uuid
+from functools import partial
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+RESPONSE_KEY = 'response:{resource}:{version}:{auth}:{digest}'
+RESPONSE_VERSION_KEY = 'response_version:{resource}'
+CATEGORIES = 'categories'
+GENRES = 'genres'
+TITLES = 'titles'
+# Отзывы и комментарии всех произведений: авторы и массовая запись.
+DISCUSSIONS = 'discussions'
+TITLE_REVIEWS = 'reviews:{title_id}'
+REVIEW_COMMENTS = 'comments:{review_id}'
+RESOURCES_MODELS = {
+    CATEGORIES: {Category},
+    GENRES: {Genre},
+    TITLES: {Title, Title.genre.through, Review, Category, Genre},
+}
+BULK_RESOURCES_MODELS = {
+    **RESOURCES_MODELS,
+    DISCUSSIONS: {Title, Review, Comment, get_user_model()},
+}
+
+
+def get_response_cache():
+    """Возвращает кеш ответов или None, если кеширование выключено."""
+    if settings.RESPONSE_CACHE is None:
+        return None
+    return caches[settings.RESPONSE_CACHE]
+
+
+def get_version_cache():
+    return caches[settings.RESPONSE_CACHE or DEFAULT_CACHE_ALIAS]
+
+
+def new_version():
+    return uuid.uuid4().hex, time.time()
+
+
+def get_versions(resources):
+    """Возвращает версии ресурсов, создавая отсутствующие."""
+    version_cache = get_version_cache()
+    keys = [RESPONSE_VERSION_KEY.format(resource=name) for name in resources]
+    for key in keys:
+        version_cache.add(key, new_version(), timeout=None)
+    versions = version_cache.get_many(keys)
+    return [versions.get(key) or new_version() for key in keys]
+
+
+def invalidate_resources(*resources):
+    """Делает устаревшими ответы ресурсов."""
+    get_version_cache().set_many({
+        RESPONSE_VERSION_KEY.format(resource=resource): new_version()
+        for resource in resources
+    }, timeout=None)
+
+
+def invalidate_resources_on_commit(*resources):
+    transaction.on_commit(partial(invalidate_resources, *resources))
+
+
+def get_model_resources(model, bulk=False):
+    """Возвращает ресурсы, ответы которых зависят от модели."""
+    resources_models = BULK_RESOURCES_MODELS if bulk else RESOURCES_MODELS
+    return [
+        resource for resource, models in resources_models.items()
+        if model in models
+    ]
+
+
+def get_response_key(request, resource, version):
+    """Ключ ответа по адресу, параметрам запроса и типу аутентификации."""
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = f'{request.get_host()}{request.path}?{query}'
+    return RESPONSE_KEY.format(
+        resource=resource,
+        version=version,
+        auth='user' if request.user.is_authenticated else 'anon',
+        digest=hashlib.md5(url.encode()).hexdigest(),
+    )
+
+
+class CachedResponseMixin:
+    """Условные запросы и кеш ответов списка ресурса.
+
+    При CONDITIONAL_GET ответ получает ETag и Last-Modified по версиям
+    ресурсов get_cached_resources(), а запрос с совпадающими If-None-Match
+    или If-Modified-Since получает 304 до обращения к queryset.
+    Если cache_responses задан, ответы хранятся в кеше RESPONSE_CACHE,
+    при cache_authenticated - и для аутентифицированных пользователей.
+    """
+
+    cached_resource = None
+    cache_responses = True
+    cache_authenticated = True
+
+    def get_cached_resources(self):
+        return (self.cached_resource,)
+
+    def is_response_cached(self, request):
+        return self.cache_responses and get_response_cache() is not None and (
+            self.cache_authenticated or not request.user.is_authenticated
+        )
+
+    def get_cached_response(self, request, get_response):
+        cached = self.is_response_cached(request)
+        if not cached and not settings.CONDITIONAL_GET:
+            return get_response()
+        versions = get_versions(self.get_cached_resources())
+        etag = hashlib.md5(':'.join(
+            [request.accepted_renderer.format] + [uid for uid, _ in versions]
+        ).encode()).hexdigest()
+        last_modified = int(max(modified for _, modified in versions))
+        if last_modified >= int(time.time()):
+            last_modified = None
+        if settings.CONDITIONAL_GET:
+            response = get_conditional_response(
+                request, etag=quote_etag(etag), last_modified=last_modified
+            )
+            if response is not None:
+                return self.set_validators(response, etag, last_modified)
+        if cached:
+            response = self.get_response_from_cache(
+                request, etag, get_response
+            )
+        else:
+            response = get_response()
+        if (
+            settings.CONDITIONAL_GET
+            and response.status_code == status.HTTP_200_OK
+        ):
+            self.set_validators(response, etag, last_modified)
+        return response
+
+    def set_validators(self, response, etag, last_modified):
+        response['ETag'] = quote_etag(etag)
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_response_from_cache(self, request, version, get_response):
+        response_cache = get_response_cache()
+        key = get_response_key(request, self.cached_resource, version)
+        data = response_cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = get_response()
+        if response.status_code == status.HTTP_200_OK:
+            response_cache.set(
+                key, response.data, settings.RESPONSE_CACHE_TIMEOUT
+            )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            request, partial(super().list, request, *args, **kwargs)
+        )
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    """Условные запросы и кеш ответов списка и объекта ресурса."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            request, partial(super().retrieve, request, *args, **kwargs)
+        )
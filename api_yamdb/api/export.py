@@ -0,0 +1,84 @@
+"""Потоковая выгрузка произведений в формате NDJSON."""
+import json
+from collections import defaultdict
+
+from reviews import models
+
+EXPORT_CHUNK_SIZE = 1000
+TITLE_FIELDS = ('id', 'name', 'year', 'rating', 'description')
+
+
+def get_name_slugs(model):
+    """Возвращает названия и слаги всех объектов модели по их id."""
+    return {
+        pk: {'name': name, 'slug': slug}
+        for pk, name, slug in model.objects.values_list('pk', 'name', 'slug')
+    }
+
+
+def refresh_name_slugs(model, name_slugs, ids):
+    """Загружает объекты модели заново, если среди ids есть новые.
+
+    Объекты, созданные во время выгрузки, иначе отсутствовали бы в ней.
+    """
+    if set(ids) - name_slugs.keys() - {None}:
+        return get_name_slugs(model)
+    return name_slugs
+
+
+def get_title_genres(first_id, last_id):
+    """Возвращает id жанров произведений из диапазона id."""
+    title_genres = defaultdict(list)
+    for title_id, genre_id in models.Title.genre.through.objects.filter(
+        title_id__gte=first_id, title_id__lte=last_id
+    ).values_list('title_id', 'genre_id'):
+        title_genres[title_id].append(genre_id)
+    return title_genres
+
+
+def iter_titles_ndjson():
+    """Возвращает все произведения строками NDJSON, по строке на пачку.
+
+    Поля совпадают с ответом /api/v1/titles/. Произведения читаются из
+    базы пачками по id, жанры пачки получаются одним запросом, а категории
+    и жанры загружаются в начале выгрузки и заново, только если пачка
+    ссылается на созданные после этого объекты, поэтому память не зависит
+    от количества произведений. Объекты, удаленные во время выгрузки,
+    пропускаются.
+    """
+    categories = get_name_slugs(models.Category)
+    genres = get_name_slugs(models.Genre)
+    last_id = 0
+    while True:
+        titles = list(
+            models.Title.objects.filter(pk__gt=last_id).order_by('pk')
+            .values_list(*TITLE_FIELDS, 'category_id')[:EXPORT_CHUNK_SIZE]
+        )
+        if not titles:
+            return
+        title_genres = get_title_genres(titles[0][0], titles[-1][0])
+        categories = refresh_name_slugs(
+            models.Category, categories,
+            (category_id for *_, category_id in titles)
+        )
+        genres = refresh_name_slugs(
+            models.Genre, genres,
+            (genre_id for ids in title_genres.values() for genre_id in ids)
+        )
+        genre_positions = {pk: position for position, pk in enumerate(genres)}
+        lines = []
+        for *values, category_id in titles:
+            title = dict(zip(TITLE_FIELDS, values))
+            title['genre'] = [
+                genres[genre_id] for genre_id in sorted(
+                    (
+                        genre_id for genre_id in title_genres[title['id']]
+                        if genre_id in genres
+                    ),
+                    key=genre_positions.get
+                )
+            ]
+            title['category'] = categories.get(category_id)
+            lines.append(json.dumps(title, ensure_ascii=False))
+        yield '\n'.join(lines) + '\n'
+        last_id = titles[-1][0]
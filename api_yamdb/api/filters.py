@@ -1,14 +1,51 @@
 import django_filters
+from django_filters.constants import EMPTY_VALUES
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
 
+from reviews import slug_cache
 from reviews.models import Title
 
 
+class RelatedSlugFilter(django_filters.CharFilter):
+    """Фильтр по слагу связанной категории или жанра.
+
+    При включенном кеше слагов фильтрует по id без соединения с таблицей
+    связанной модели.
+    """
+
+    def __init__(self, relation, **kwargs):
+        self.relation = relation
+        super().__init__(field_name=f'{relation}__slug', **kwargs)
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES or not slug_cache.is_enabled():
+            return super().filter(qs, value)
+        model = qs.model._meta.get_field(self.relation).related_model
+        pk = slug_cache.NAME_SLUG_CACHES[model].get_id(value)
+        if pk is None:
+            return qs.none()
+        return qs.filter(**{self.relation: pk})
+
+
 class TitleFilter(django_filters.FilterSet):
     """Фильтр для произведений."""
 
-    genre = django_filters.CharFilter(field_name='genre__slug')
-    category = django_filters.CharFilter(field_name='category__slug')
+    genre = RelatedSlugFilter('genre')
+    category = RelatedSlugFilter('category')
 
     class Meta:
         model = Title
         fields = ('name', 'year', 'genre', 'category')
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Ранжированный полнотекстовый поиск по параметру `search`."""
+
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return queryset.search(query)
@@ -0,0 +1,127 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.utils import build_confirmation_email
+from reviews.models import OutboxEmail
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_INTERVAL = 5.0
+RETRY_DELAY = 30
+MAX_RETRY_DELAY = 60 * 60
+POSITIVE_ERROR = 'Значение {option} должно быть положительным числом'
+SUCCESS_SEND = 'Отправлено писем: {sent}, отложено: {failed}.'
+CONNECTION_ERROR = 'Не удалось подключиться к почтовому серверу: {error}'
+
+
+def get_retry_delay(attempts):
+    """Задержка перед повторной отправкой, удваивающаяся с каждой попыткой."""
+    return timedelta(
+        seconds=min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пачками через одно соединение '
+        'с почтовым сервером, откладывая неотправленные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество писем, получаемых из очереди за один раз.'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=DEFAULT_MAX_ATTEMPTS,
+            help='Количество попыток, после которых письмо не отправляется.'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, проверяя очередь каждые --interval секунд.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=DEFAULT_INTERVAL,
+            help='Пауза между проверками очереди в секундах.'
+        )
+
+    def get_batch(self):
+        return list(
+            OutboxEmail.objects.select_related('user').filter(
+                next_attempt__lte=timezone.now()
+            )[:self.batch_size]
+        )
+
+    def postpone(self, email, error):
+        """Откладывает письмо или прекращает попытки его отправить."""
+        email.attempts += 1
+        email.last_error = str(error)
+        email.next_attempt = (
+            timezone.now() + get_retry_delay(email.attempts)
+            if email.attempts < self.max_attempts else None
+        )
+
+    def send_batch(self, connection, emails):
+        sent, failed = [], []
+        for email in emails:
+            try:
+                connection.send_messages(
+                    [build_confirmation_email(email.user)]
+                )
+            except Exception as error:
+                self.postpone(email, error)
+                failed.append(email)
+            else:
+                sent.append(email.pk)
+        OutboxEmail.objects.filter(pk__in=sent).delete()
+        OutboxEmail.objects.bulk_update(
+            failed, ('attempts', 'next_attempt', 'last_error')
+        )
+        return len(sent), len(failed)
+
+    def drain(self):
+        """Отправляет все письма, время отправки которых наступило."""
+        total_sent = total_failed = 0
+        emails = self.get_batch()
+        if not emails:
+            return total_sent, total_failed
+        with get_connection() as connection:
+            while emails:
+                sent, failed = self.send_batch(connection, emails)
+                total_sent += sent
+                total_failed += failed
+                emails = self.get_batch()
+        return total_sent, total_failed
+
+    def handle(self, *args, **options):
+        for option in ('batch_size', 'max_attempts'):
+            if options[option] < 1:
+                raise CommandError(POSITIVE_ERROR.format(option=option))
+        self.batch_size = options['batch_size']
+        self.max_attempts = options['max_attempts']
+        while True:
+            try:
+                sent, failed = self.drain()
+            except OSError as error:
+                if not options['loop']:
+                    raise CommandError(CONNECTION_ERROR.format(error=error))
+                self.stderr.write(CONNECTION_ERROR.format(error=error))
+            else:
+                if sent or failed or not options['loop']:
+                    self.stdout.write(
+                        SUCCESS_SEND.format(sent=sent, failed=failed)
+                    )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
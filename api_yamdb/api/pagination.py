@@ -0,0 +1,154 @@
+import json
+from base64 import b64decode, b64encode
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class ModelOrderingCursorPagination(CursorPagination):
+    """Курсорная пагинация по сортировке модели из `Meta.ordering`.
+
+    Курсор хранит значения всех полей сортировки у крайнего объекта
+    страницы, а следующая страница выбирается составным условием по этим
+    полям (keyset), поэтому совпадающие значения первого поля не
+    ограничивают глубину пагинации. Поля сортировки не допускают NULL.
+    """
+
+    page_size_query_param = 'limit'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(queryset.model._meta.ordering)
+        pk_name = queryset.model._meta.pk.name
+        if not {pk_name, f'-{pk_name}'} & set(ordering):
+            ordering += (pk_name,)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-'))
+            for name in self.ordering
+        ]
+        position, self.reverse = self.decode_cursor(request)
+        ordering = self.ordering
+        if self.reverse:
+            ordering = [
+                name[1:] if name.startswith('-') else f'-{name}'
+                for name in ordering
+            ]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(
+                ordering, position
+            ))
+        results = list(queryset[:self.page_size + 1])
+        self.has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+        self.has_cursor = position is not None
+        return self.page
+
+    @staticmethod
+    def get_keyset_filter(ordering, position):
+        """Условие для объектов после позиции в порядке ordering.
+
+        Первое поле дополнительно ограничено нестрогим неравенством,
+        чтобы база данных читала индекс сортировки с позиции курсора.
+        """
+        conditions = []
+        for idx, name in enumerate(ordering):
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            equal = {
+                previous.lstrip('-'): position[previous_idx]
+                for previous_idx, previous in enumerate(ordering[:idx])
+            }
+            conditions.append(Q(
+                **equal, **{f'{name.lstrip("-")}__{lookup}': position[idx]}
+            ))
+        first = ordering[0]
+        lookup = 'lte' if first.startswith('-') else 'gte'
+        return (
+            Q(**{f'{first.lstrip("-")}__{lookup}': position[0]})
+            & reduce(or_, conditions)
+        )
+
+    def get_position(self, instance):
+        return [field.value_to_string(instance) for field in self.fields]
+
+    def get_next_link(self):
+        if not self.page or (not self.reverse and not self.has_more):
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.page or (
+            not self.has_more if self.reverse else not self.has_cursor
+        ):
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            values, reverse = json.loads(b64decode(encoded.encode()))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ], bool(reverse)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse):
+        encoded = b64encode(json.dumps([position, reverse]).encode())
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.decode()
+        )
+
+
+class LimitOffsetOrCursorPagination(LimitOffsetPagination):
+    """Пагинация limit/offset с переключением на курсорную по запросу.
+
+    Курсорный режим включается параметром `?pagination=cursor` либо
+    наличием курсора в запросе. В этом режиме ответ не содержит `count`,
+    а страницы выбираются по значению сортировки без OFFSET.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_paginator = None
+
+    def is_cursor_mode(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or ModelOrderingCursorPagination.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_mode(request):
+            self.cursor_paginator = ModelOrderingCursorPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -8,6 +8,20 @@ def is_admin(request):
     )
 
 
+def is_admin_or_moderator(request):
+    """Проверяет роль модератора или администратора.
+
+    Результат запоминается в запросе и не пересчитывается для каждого
+    проверяемого объекта.
+    """
+    if not hasattr(request, '_is_admin_or_moderator'):
+        user = request.user
+        request._is_admin_or_moderator = user.is_authenticated and (
+            user.is_admin or user.is_moderator
+        )
+    return request._is_admin_or_moderator
+
+
 class AdminsPermissions(permissions.BasePermission):
     """Задает права доступа для администраторов и суперпользователей."""
 
@@ -18,16 +32,15 @@ class AdminsPermissions(permissions.BasePermission):
 class IsAdminOrModeratorOrAuthor(permissions.BasePermission):
     """Устанавливает доступ суперпользователю/админу/модератору/автору.
 
-    Анонимным пользователям доступ только на чтение.
+    Анонимным пользователям доступ только на чтение. Авторство проверяется
+    по id без загрузки связанного пользователя.
     """
 
     def has_object_permission(self, request, view, obj):
-        user = request.user
         return (
             request.method in permissions.SAFE_METHODS
-            or obj.author == user
-            or user.is_authenticated and user.is_moderator
-            or is_admin(request)
+            or obj.author_id == request.user.pk
+            or is_admin_or_moderator(request)
         )
 
 
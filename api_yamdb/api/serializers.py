@@ -1,8 +1,9 @@
 from django.core.validators import RegexValidator
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
 
-from reviews import constants as reviews_const, models
+from reviews import constants as reviews_const, models, slug_cache
 from reviews.validators import validate_invalid_username
 
 DOUBLE_REVIEW_ERROR = 'Можно оставлять только один отзыв на одно произведение.'
@@ -24,12 +25,39 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
+class CachedCategorySerializer(CategorySerializer):
+    """Категория произведения, при включенном кеше слагов - из кеша."""
+
+    def get_attribute(self, instance):
+        if not slug_cache.is_enabled():
+            return super().get_attribute(instance)
+        return slug_cache.NAME_SLUG_CACHES[models.Category].get_object(
+            instance.category_id
+        )
+
+
+class CachedSlugRelatedField(SlugRelatedField):
+    """Поле слага, при включенном кеше слагов не обращающееся к базе."""
+
+    def to_internal_value(self, data):
+        if not slug_cache.is_enabled():
+            return super().to_internal_value(data)
+        model_cache = slug_cache.NAME_SLUG_CACHES[self.queryset.model]
+        instance = model_cache.get_object(model_cache.get_id(smart_str(data)))
+        if instance is None:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+        return instance
+
+
 class TitleReadSerializer(serializers.ModelSerializer):
     """Сериализатор для произведений (чтение)."""
 
-    category = CategorySerializer()
+    category = CachedCategorySerializer()
     genre = GenreSerializer(many=True)
-    rating = serializers.IntegerField(default=None)
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = models.Title
@@ -41,10 +69,10 @@ class TitleReadSerializer(serializers.ModelSerializer):
 class TitleWrightSerializer(serializers.ModelSerializer):
     """Сериализатор для произведений (запись)."""
 
-    category = SlugRelatedField(
+    category = CachedSlugRelatedField(
         slug_field='slug',
         queryset=models.Category.objects.all())
-    genre = SlugRelatedField(
+    genre = CachedSlugRelatedField(
         slug_field='slug', many=True, allow_null=False, allow_empty=False,
         queryset=models.Genre.objects.all())
 
@@ -57,6 +85,25 @@ class TitleWrightSerializer(serializers.ModelSerializer):
         return TitleReadSerializer(instance).data
 
 
+class TitleBulkSerializer(serializers.ModelSerializer):
+    """Сериализатор произведения в массовой записи.
+
+    Слаги категории и жанров не проверяются по базе: они проверяются
+    для всех произведений сразу.
+    """
+
+    id = serializers.IntegerField(required=False)
+    category = serializers.SlugField()
+    genre = serializers.ListField(
+        child=serializers.SlugField(), allow_empty=False
+    )
+
+    class Meta:
+        model = models.Title
+        fields = ('id', 'name', 'year', 'description',
+                  'genre', 'category')
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username',
@@ -73,11 +120,10 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         request = self.context['request']
-        if request.method == 'POST' and models.Review.objects.filter(
-            title_id=self.context['view'].kwargs['title_id'],
-            author=request.user,
-        ).exists():
-            raise serializers.ValidationError(DOUBLE_REVIEW_ERROR)
+        if request.method == 'POST':
+            title = self.context['view'].get_title()
+            if title.reviews.filter(author=request.user).exists():
+                raise serializers.ValidationError(DOUBLE_REVIEW_ERROR)
         return super().validate(attrs)
 
 
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import bulk_changed
+from . import caching
+from .authentication import revoke_all_claims, revoke_claims
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def revoke_user_claims(sender, instance, **kwargs):
+    """Отзывает данные токенов пользователя при его изменении."""
+    revoke_claims(instance.pk)
+
+
+@receiver(bulk_changed, sender=User)
+def revoke_bulk_changed_claims(sender, **kwargs):
+    """Отзывает данные токенов всех пользователей после массовой записи."""
+    revoke_all_claims()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_discussions(sender, instance, **kwargs):
+    """Сбрасывает ответы отзывов и комментариев с именем автора."""
+    if not kwargs.get('created'):
+        caching.invalidate_resources_on_commit(caching.DISCUSSIONS)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def invalidate_cached_responses(sender, **kwargs):
+    """Сбрасывает кешированные ответы ресурсов измененной модели."""
+    caching.invalidate_resources_on_commit(
+        *caching.get_model_resources(sender)
+    )
+
+
+@receiver(bulk_changed)
+def invalidate_bulk_changed_responses(sender, **kwargs):
+    caching.invalidate_resources_on_commit(
+        *caching.get_model_resources(sender, bulk=True)
+    )
+
+
+@receiver(post_delete, sender=Title)
+def invalidate_title_reviews(sender, instance, **kwargs):
+    caching.invalidate_resources_on_commit(
+        caching.TITLE_REVIEWS.format(title_id=instance.pk)
+    )
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_responses(sender, instance, **kwargs):
+    """Сбрасывает ответы отзывов произведения и комментариев отзыва."""
+    caching.invalidate_resources_on_commit(
+        caching.TITLE_REVIEWS.format(title_id=instance.title_id),
+        caching.REVIEW_COMMENTS.format(review_id=instance.pk),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_responses(sender, instance, **kwargs):
+    caching.invalidate_resources_on_commit(
+        caching.REVIEW_COMMENTS.format(review_id=instance.review_id)
+    )
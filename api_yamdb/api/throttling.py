@@ -0,0 +1,137 @@
+"""Ограничение частоты запросов алгоритмом token bucket.
+
+Для каждого ключа хранится пара (количество токенов, время обновления).
+Токены восстанавливаются равномерно до размера корзины, каждый запрос
+расходует один токен, поэтому проверка не зависит от числа запросов.
+"""
+import hashlib
+from collections import OrderedDict
+from collections.abc import Mapping
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+MEMORY_STORAGE_SIZE = 100_000
+
+
+def take_token(state, capacity, rate, now):
+    """Расходует токен корзины.
+
+    Возвращает новое состояние корзины и время ожидания в секундах,
+    нулевое, если токен был.
+    """
+    tokens, updated = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / rate
+
+
+class MemoryBucketStorage:
+    """Корзины в памяти процесса.
+
+    Хранит не больше size корзин, вытесняя давно не использованные.
+    """
+
+    def __init__(self, size=MEMORY_STORAGE_SIZE):
+        self.size = size
+        self.buckets = OrderedDict()
+        self.lock = Lock()
+
+    def consume(self, key, capacity, rate, now):
+        with self.lock:
+            state, wait = take_token(
+                self.buckets.pop(key, None), capacity, rate, now
+            )
+            self.buckets[key] = state
+            if len(self.buckets) > self.size:
+                self.buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketStorage:
+    """Корзины в кеше Django, общем для процессов.
+
+    Чтение и запись корзины не атомарны, поэтому при одновременных
+    запросах с одним ключом ограничение может пропустить лишние запросы.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def consume(self, key, capacity, rate, now):
+        state, wait = take_token(self.cache.get(key), capacity, rate, now)
+        self.cache.set(key, state, timeout=int(capacity / rate) + 1)
+        return wait
+
+
+memory_storage = MemoryBucketStorage()
+
+
+def get_storage():
+    if settings.THROTTLE_CACHE is None:
+        return memory_storage
+    return CacheBucketStorage(caches[settings.THROTTLE_CACHE])
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Ограничение частоты запросов с корзиной на ключ.
+
+    Размер корзины и скорость восстановления задает частота scope из
+    DEFAULT_THROTTLE_RATES: '10/min' - 10 запросов подряд, затем один
+    запрос в 6 секунд. Частота None отключает ограничение.
+    """
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        self.delay = get_storage().consume(
+            key, self.num_requests, self.num_requests / self.duration,
+            self.timer()
+        )
+        return not self.delay
+
+    def wait(self):
+        return self.delay
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Ограничение запросов аутентификации с одного IP."""
+
+    scope = 'auth_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope, 'ident': self.get_ident(request)
+        }
+
+
+class AuthUsernameThrottle(TokenBucketThrottle):
+    """Ограничение запросов аутентификации для одного логина."""
+
+    scope = 'auth_username'
+
+    def get_cache_key(self, request, view):
+        username = (
+            request.data.get('username')
+            if isinstance(request.data, Mapping) else None
+        )
+        if not isinstance(username, str) or not username:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': hashlib.md5(username.encode()).hexdigest(),
+        }
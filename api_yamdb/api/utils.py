@@ -1,22 +1,76 @@
+from functools import lru_cache
+from itertools import islice
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import get_template
+from django.utils import timezone
+
+from reviews.models import OutboxEmail
 
 User = get_user_model()
 
 CONFIRMATION_EMAIL_BODY = 'confirmation_code_email_body.txt'
 CONFIRMATION_EMAIL_SUBJECT = 'confirmation_code_email_subject.txt'
+EMAIL_CHUNK_SIZE = 100
+
+
+@lru_cache(maxsize=None)
+def get_email_template(template_name):
+    """Возвращает шаблон письма, скомпилированный один раз за процесс."""
+    return get_template(template_name)
+
+
+def build_confirmation_email(
+    user: User, confirmation_code: str = None, connection=None
+) -> EmailMessage:
+    """Создает письмо подтверждения.
+
+    Если код не передан, создается действующий код пользователя.
+    """
+    context = {
+        'user': user,
+        'confirmation_code': (
+            confirmation_code or default_token_generator.make_token(user)
+        ),
+    }
+    subject = get_email_template(CONFIRMATION_EMAIL_SUBJECT).render(context)
+    return EmailMessage(
+        ' '.join(subject.split()),
+        get_email_template(CONFIRMATION_EMAIL_BODY).render(context),
+        settings.DEFAULT_FROM_EMAIL,
+        [user.email],
+        connection=connection,
+    )
 
 
 def send_confirmation_email(user: User, confirmation_code: str) -> bool:
     """Отправляет письмо подтверждения на электронную почту пользователя."""
-    return bool(send_mail(
-        CONFIRMATION_EMAIL_SUBJECT,
-        render_to_string(CONFIRMATION_EMAIL_BODY, {
-            'user': user,
-            'confirmation_code': confirmation_code,
-        }),
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email]
-    ))
+    return bool(build_confirmation_email(user, confirmation_code).send())
+
+
+def send_confirmation_emails(users, chunk_size=EMAIL_CHUNK_SIZE) -> int:
+    """Отправляет письма подтверждения с действующими кодами пользователям.
+
+    Письма отправляются пачками по chunk_size через одно соединение
+    с почтовым сервером. Возвращает количество отправленных писем.
+    """
+    users = iter(users)
+    sent = 0
+    with get_connection() as connection:
+        while chunk := list(islice(users, chunk_size)):
+            sent += connection.send_messages(
+                [build_confirmation_email(user) for user in chunk]
+            ) or 0
+    return sent
+
+
+def enqueue_confirmation_email(user: User) -> None:
+    """Ставит письмо подтверждения в очередь отправки."""
+    OutboxEmail.objects.update_or_create(user=user, defaults={
+        'attempts': 0,
+        'next_attempt': timezone.now(),
+        'last_error': '',
+    })
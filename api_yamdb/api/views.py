@@ -1,7 +1,8 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 from django.db import IntegrityError
-from django.db.models import Avg
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import (
@@ -11,22 +12,33 @@ from rest_framework import (
     status,
     viewsets,
 )
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (
+    action,
+    api_view,
+    permission_classes,
+    throttle_classes,
+)
 from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from api import (
+    bulk,
+    caching,
+    export,
     serializers as api_serializers,
     permissions as api_permissions,
     utils,
 )
-from api.filters import TitleFilter
-from reviews import constants as const, models
+from api.authentication import get_access_token
+from api.filters import FullTextSearchFilter, TitleFilter
+from api.pagination import LimitOffsetOrCursorPagination
+from api.throttling import AuthIPThrottle, AuthUsernameThrottle
+from reviews import constants as const, models, slug_cache
 
 
 class NameSlugViewSet(
+    caching.CachedResponseMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
@@ -35,8 +47,7 @@ class NameSlugViewSet(
     """Базовый вьюсет для категорий и жанров."""
 
     permission_classes = (api_permissions.IsAdminOrReadOnly,)
-    filter_backends = (SearchFilter,)
-    search_fields = ('name',)
+    filter_backends = (FullTextSearchFilter,)
     lookup_field = 'slug'
 
 
@@ -45,6 +56,7 @@ class CategoryViewSet(NameSlugViewSet):
 
     queryset = models.Category.objects.all()
     serializer_class = api_serializers.CategorySerializer
+    cached_resource = caching.CATEGORIES
 
 
 class GenreViewSet(NameSlugViewSet):
@@ -52,24 +64,88 @@ class GenreViewSet(NameSlugViewSet):
 
     queryset = models.Genre.objects.all()
     serializer_class = api_serializers.GenreSerializer
+    cached_resource = caching.GENRES
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(caching.CachedRetrieveMixin, viewsets.ModelViewSet):
     """Представление для произведений."""
 
     http_method_names = ('get', 'post', 'patch', 'delete', 'head', 'options')
-    queryset = models.Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).order_by(*models.Title._meta.ordering)
+    queryset = models.Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     permission_classes = (api_permissions.IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend, SearchFilter)
+    pagination_class = LimitOffsetOrCursorPagination
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
     filterset_class = TitleFilter
+    cached_resource = caching.TITLES
+    cache_authenticated = False
+
+    def perform_create(self, serializer):
+        # Жанры сохраняются после post_save, поэтому кеш сбрасывается здесь.
+        super().perform_create(serializer)
+        caching.invalidate_resources_on_commit(
+            *caching.get_model_resources(models.Title.genre.through)
+        )
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        caching.invalidate_resources_on_commit(
+            *caching.get_model_resources(models.Title.genre.through)
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if slug_cache.is_enabled():
+            slug_cache.refresh_caches()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if slug_cache.is_enabled():
+            return queryset.select_related(None)
+        return queryset
 
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
             return api_serializers.TitleReadSerializer
         return api_serializers.TitleWrightSerializer
 
+    @action(methods=('post',),
+            detail=False,
+            url_path='bulk',
+            permission_classes=(api_permissions.AdminsPermissions,))
+    def bulk(self, request, *args, **kwargs):
+        """Массовое создание и изменение произведений.
+
+        Принимает список произведений, элементы с id изменяют существующие.
+        С параметром partial_success=true сохраняются корректные элементы,
+        иначе при любой ошибке не сохраняется ничего.
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError(const.BULK_NOT_LIST_ERROR)
+        if len(request.data) > const.BULK_TITLES_LIMIT:
+            raise ValidationError(const.BULK_LIMIT_ERROR)
+        partial_success = request.query_params.get(
+            'partial_success', ''
+        ).lower() in ('1', 'true')
+        results = bulk.save_titles(request.data, partial_success)
+        if not partial_success and any(
+            result['status'] == bulk.INVALID for result in results
+        ):
+            return Response(results, status=status.HTTP_400_BAD_REQUEST)
+        return Response(results, status=status.HTTP_200_OK)
+
+    @action(methods=('get',),
+            detail=False,
+            url_path='export',
+            permission_classes=(api_permissions.AdminsPermissions,))
+    def export(self, request, *args, **kwargs):
+        """Потоковая выгрузка всех произведений в формате NDJSON."""
+        return StreamingHttpResponse(
+            export.iter_titles_ndjson(),
+            content_type='application/x-ndjson',
+        )
+
 
 class HttpMethodsPermissionsMixin:
     permission_classes = (
@@ -77,45 +153,95 @@ class HttpMethodsPermissionsMixin:
         api_permissions.IsAdminOrModeratorOrAuthor,
     )
     http_method_names = ('get', 'post', 'patch', 'delete', 'head', 'options')
+    pagination_class = LimitOffsetOrCursorPagination
 
     def get_title(self):
-        """Метод возвращает объект произведения по id полученного из url."""
-        return get_object_or_404(models.Title, pk=self.kwargs['title_id'])
+        """Метод возвращает объект произведения по id полученного из url.
+
+        Объект запоминается и переиспользуется до конца обработки запроса.
+        """
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                models.Title, pk=self.kwargs['title_id']
+            )
+        return self._title
+
+    def is_detail(self):
+        """Проверяет, что запрос адресован конкретному объекту."""
+        return self.lookup_field in self.kwargs
 
 
-class ReviewViewSet(HttpMethodsPermissionsMixin, viewsets.ModelViewSet):
+class ReviewViewSet(
+    HttpMethodsPermissionsMixin,
+    caching.CachedRetrieveMixin,
+    viewsets.ModelViewSet
+):
     """Вьюсет для работы с отзывами."""
 
     serializer_class = api_serializers.ReviewSerializer
+    cache_responses = False
+
+    def get_cached_resources(self):
+        return (
+            caching.TITLE_REVIEWS.format(title_id=self.kwargs['title_id']),
+            caching.DISCUSSIONS,
+        )
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        if self.is_detail():
+            return models.Review.objects.select_related('author').filter(
+                title_id=self.kwargs['title_id']
+            )
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(HttpMethodsPermissionsMixin, viewsets.ModelViewSet):
+class CommentViewSet(
+    HttpMethodsPermissionsMixin,
+    caching.CachedRetrieveMixin,
+    viewsets.ModelViewSet
+):
     """Представление для комментариев."""
 
     serializer_class = api_serializers.CommentSerializer
+    cache_responses = False
+
+    def get_cached_resources(self):
+        return (
+            caching.REVIEW_COMMENTS.format(
+                review_id=self.kwargs['review_id']
+            ),
+            caching.DISCUSSIONS,
+        )
 
     def get_review(self):
         """Метод возвращает объект отзыва к произведению.
 
-        Поиск отзыва по id полученного из url.
+        Поиск отзыва по id полученного из url. Отзыв и произведение
+        проверяются одним запросом, результат запоминается до конца
+        обработки запроса.
         """
-        return get_object_or_404(
-            models.Review,
-            title=self.get_title(),
-            pk=self.kwargs['review_id'],
-        )
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                models.Review.objects.select_related('title'),
+                title_id=self.kwargs['title_id'],
+                pk=self.kwargs['review_id'],
+            )
+            self._title = self._review.title
+        return self._review
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        if self.is_detail():
+            return models.Comment.objects.select_related('author').filter(
+                review_id=self.kwargs['review_id'],
+                review__title_id=self.kwargs['title_id'],
+            )
+        return self.get_review().comments.select_related('author')
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -141,20 +267,25 @@ class UserViewSet(viewsets.ModelViewSet):
     def profile(self, request, *args, **kwargs):
         """Представление для API Профиля пользователя."""
         serializer_class = api_serializers.ProfileSerializer
+        user = request.user
+        if user.get_deferred_fields():
+            # Пользователь собран из токена: профиль берется из базы данных.
+            user = models.User.objects.get(pk=user.pk)
         if request.method == 'PATCH':
             profile_serializer = serializer_class(
-                request.user, data=request.data, partial=True
+                user, data=request.data, partial=True
             )
             profile_serializer.is_valid(raise_exception=True)
             profile_serializer.save()
         else:
-            profile_serializer = serializer_class(request.user)
+            profile_serializer = serializer_class(user)
 
         return Response(profile_serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
 def get_token_api_view(request):
     """Представление для получения токена аунтентификации."""
     serializer = api_serializers.UsernameConfirmationCodeSerializer(
@@ -168,15 +299,57 @@ def get_token_api_view(request):
 
     if default_token_generator.check_token(user, confirmation_code):
         return Response(
-            {'token': str(RefreshToken.for_user(user).access_token)},
+            {'token': str(get_access_token(user))},
             status=status.HTTP_200_OK,
         )
 
     raise ValidationError(const.CONFIRMATION_CODE_ERROR)
 
 
+def find_signup_user(username, email):
+    """Ищет пользователя для регистрации одним запросом.
+
+    Возвращает пользователя с этими логином и email, если он есть, и
+    ошибки полей, занятых другими пользователями.
+    """
+    errors = {}
+    for user in models.User.objects.filter(
+        Q(username=username) | Q(email=email)
+    ).order_by()[:2]:
+        if user.username == username and user.email == email:
+            return user, {}
+        if user.username == username:
+            errors['username'] = const.SIGNUP_USERNAME_ERROR.format(
+                username=username
+            )
+        else:
+            errors['email'] = const.SIGNUP_EMAIL_ERROR.format(email=email)
+    return None, {
+        field: errors[field] for field in ('username', 'email')
+        if field in errors
+    }
+
+
+def get_or_create_signup_user(username, email):
+    """Возвращает пользователя для регистрации, создавая нового.
+
+    Если пользователь создан параллельным запросом, совпадения
+    ищутся повторно.
+    """
+    user, errors = find_signup_user(username, email)
+    if user is None and not errors:
+        try:
+            return models.User.objects.create(username=username, email=email)
+        except IntegrityError:
+            user, errors = find_signup_user(username, email)
+    if errors:
+        raise ValidationError(errors)
+    return user
+
+
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
 def signup_api_view(request):
     """Представление для самостоятельной регистрации.
 
@@ -187,21 +360,11 @@ def signup_api_view(request):
     serializer = api_serializers.UserSignupSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     data = serializer.validated_data
-    username = data['username']
-    email = data['email']
-    try:
-        user, _ = models.User.objects.get_or_create(
-            username=username,
-            email=email,
+    user = get_or_create_signup_user(data['username'], data['email'])
+    if settings.EMAIL_OUTBOX:
+        utils.enqueue_confirmation_email(user)
+    else:
+        utils.send_confirmation_email(
+            user, default_token_generator.make_token(user)
         )
-    except IntegrityError:
-        error = {'email': f'Данный Email {email} уже занят.'}
-        if models.User.objects.filter(username=username).exists():
-            error = {'username': f'Данный логин {username} уже занят.'}
-
-        raise ValidationError(error)
-
-    utils.send_confirmation_email(
-        user, default_token_generator.make_token(user)
-    )
     return Response(data, status=status.HTTP_200_OK)
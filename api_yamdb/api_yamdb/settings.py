@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -55,12 +56,51 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+ENV_TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+# База данных задается переменными окружения: DB_ENGINE - sqlite3
+# (по умолчанию) или postgresql, DB_NAME, DB_USER, DB_PASSWORD, DB_HOST,
+# DB_PORT. DB_CONN_MAX_AGE - время жизни соединения в секундах (0 - новое
+# соединение на каждый запрос), DB_CONN_HEALTH_CHECKS - проверять постоянное
+# соединение в начале запроса.
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite3')
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'api_yamdb'),
+            'USER': os.getenv('DB_USER', 'postgres'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+DATABASES['default'].update(
+    CONN_MAX_AGE=int(os.getenv('DB_CONN_MAX_AGE', 0)),
+    CONN_HEALTH_CHECKS=(
+        os.getenv('DB_CONN_HEALTH_CHECKS', '').lower() in ENV_TRUE_VALUES
+    ),
+)
+
+# PRAGMA для каждого нового соединения SQLite. DB_SQLITE_WAL включает
+# журнал WAL, при котором чтение не блокируется записью, ожидание
+# блокировки до 5 секунд и кеш страниц 20 МБ.
+SQLITE_PRAGMAS = {}
+if os.getenv('DB_SQLITE_WAL', '').lower() in ENV_TRUE_VALUES:
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'busy_timeout': 5000,
+        'cache_size': -20000,
+        'temp_store': 'memory',
     }
-}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -84,17 +124,49 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly'],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.JWTClaimsAuthentication',
     ],
     'PAGE_SIZE': 10,
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    # Частота запросов к auth/signup/ и auth/token/ с одного IP и для
+    # одного логина, например '20/min'. None отключает ограничение.
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': None,
+        'auth_username': None,
+    },
+    # Число доверенных прокси-серверов перед приложением: IP клиента
+    # берется из X-Forwarded-For с учетом только их адресов. 0 - REMOTE_ADDR,
+    # заголовок, который может подделать клиент, не используется.
+    'NUM_PROXIES': 0,
 }
 
+# Хранить корзины ограничения частоты запросов в кеше из CACHES,
+# общем для процессов. None - в памяти процесса.
+THROTTLE_CACHE = None
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Собирать пользователя из данных токена без запроса к базе данных.
+# При нескольких процессах требует общего кеша (CACHES) для отзыва токенов.
+JWT_CLAIMS_AUTH = False
+
+# Определять категории и жанры по слагу из кеша в памяти процесса.
+# При нескольких процессах требует общего кеша (CACHES) для сброса кеша.
+NAME_SLUG_CACHE = False
+
+# Кешировать списки категорий и жанров и ответы произведений анонимам.
+# Имя кеша из CACHES (например, файлового или Redis) или None.
+RESPONSE_CACHE = None
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+
+# Отдавать ETag и Last-Modified и отвечать 304 на условные GET запросы.
+# Версии ресурсов хранятся в кеше RESPONSE_CACHE или default, поэтому
+# при нескольких процессах требуется общий кеш (CACHES).
+CONDITIONAL_GET = False
+
 LANGUAGE_CODE = 'ru-RU'
 
 TIME_ZONE = 'UTC'
@@ -111,6 +183,10 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'tmp/messages/'
 
+# Ставить письма подтверждения в очередь вместо отправки при регистрации.
+# Очередь отправляет команда send_emails.
+EMAIL_OUTBOX = False
+
 AUTH_USER_MODEL = 'reviews.User'
 
 USERNAME_INVALID = 'me'
@@ -51,3 +51,10 @@ class TitleAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description',)
     list_editable = ('description', )
     list_filter = ('year',)
+
+
+@admin.register(models.OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('user', 'attempts', 'next_attempt', 'last_error',)
+    list_select_related = ('user',)
+    search_fields = ('user__email',)
@@ -6,5 +6,14 @@ EMAIL_LENGTH = 254
 USERNAME_LENGTH = 150
 MIN_SCORE_VALUE = 1
 MAX_SCORE_VALUE = 10
+FILE_PATH_LENGTH = 1024
 
 CONFIRMATION_CODE_ERROR = 'Некоректный код подтверждения.'
+SIGNUP_USERNAME_ERROR = 'Данный логин {username} уже занят.'
+SIGNUP_EMAIL_ERROR = 'Данный Email {email} уже занят.'
+BULK_TITLES_LIMIT = 1000
+BULK_NOT_LIST_ERROR = 'Ожидается список произведений.'
+BULK_LIMIT_ERROR = (
+    f'За один запрос можно сохранить не больше {BULK_TITLES_LIMIT} '
+    f'произведений.'
+)
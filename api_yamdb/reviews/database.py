@@ -0,0 +1,36 @@
+"""Настройка соединений с базой данных."""
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def set_sqlite_pragmas(sender, connection, **kwargs):
+    """Выполняет PRAGMA из SQLITE_PRAGMAS для нового соединения SQLite."""
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def close_if_unusable(connection):
+    """Закрывает соединение, если база данных больше его не принимает.
+
+    Новое соединение откроется при следующем запросе к базе данных.
+    """
+    if (
+        connection.settings_dict.get('CONN_HEALTH_CHECKS')
+        and connection.connection is not None
+        and not connection.is_usable()
+    ):
+        connection.close()
+
+
+@receiver(request_started)
+def close_unusable_connections(**kwargs):
+    """Проверяет постоянные соединения перед обработкой запроса."""
+    for connection in connections.all():
+        close_if_unusable(connection)
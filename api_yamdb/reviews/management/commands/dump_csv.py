@@ -0,0 +1,195 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from reviews.management.commands.load_csv import (
+    CATEGORY_FILE_NAME, COMMENT_FILE_NAME, FILES_MODELS, GENRE_FILE_NAME,
+    GZIP_SUFFIX, REVIEW_FILE_NAME, TITLE_FILE_NAME, TITLE_GENRE_FILE_NAME,
+    USER_FILE_NAME, open_text_file
+)
+
+CSV_FORMAT = 'csv'
+NDJSON_FORMAT = 'ndjson'
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_WORKERS = 4
+FILES_COLUMNS = {
+    USER_FILE_NAME: (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name',
+        'is_staff', 'is_superuser', 'is_active', 'password', 'last_login',
+        'date_joined',
+    ),
+    CATEGORY_FILE_NAME: ('id', 'name', 'slug'),
+    GENRE_FILE_NAME: ('id', 'name', 'slug'),
+    TITLE_FILE_NAME: ('id', 'name', 'year', 'category', 'description'),
+    TITLE_GENRE_FILE_NAME: ('id', 'title_id', 'genre_id'),
+    REVIEW_FILE_NAME: (
+        'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+    ),
+    COMMENT_FILE_NAME: ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+OUTPUT_DIR_ERROR = 'Директории {path} не существует'
+UNEXPECTED_FILE_NAME_ERROR = 'Неизвестный файл {file}'
+POSITIVE_ERROR = 'Значение {option} должно быть положительным числом'
+SUCCESS_MODEL_DUMP = (
+    'Выгружено {count} записей {model} в {file} '
+    'за {seconds:.2f} с ({rate:.0f} записей/с).'
+)
+
+
+def to_csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def to_json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает таблицы в csv или NDJSON файлы с колонками, '
+        'которые принимает load_csv.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output_dir',
+            type=str,
+            help='Директория для выгружаемых файлов.'
+        )
+        parser.add_argument(
+            'file_name',
+            nargs='*',
+            type=str,
+            help='Имена выгружаемых csv файлов, по умолчанию все.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=(CSV_FORMAT, NDJSON_FORMAT),
+            default=CSV_FORMAT,
+            help='Формат файлов.'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество записей, получаемых из базы за один раз.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help='Количество таблиц, выгружаемых одновременно.'
+        )
+
+    def get_file_names(self, file_names):
+        for file_name in file_names:
+            if file_name not in FILES_MODELS:
+                raise CommandError(
+                    UNEXPECTED_FILE_NAME_ERROR.format(file=file_name)
+                )
+        return file_names or list(FILES_MODELS)
+
+    def get_output_path(self, output_dir, file_name):
+        name, _ = os.path.splitext(file_name)
+        path = os.path.join(output_dir, f'{name}.{self.format}')
+        return path + GZIP_SUFFIX if self.gzip else path
+
+    def write_csv(self, output_file, columns, rows):
+        writer = csv.writer(output_file)
+        writer.writerow(columns)
+        count = 0
+        for row in rows:
+            writer.writerow([to_csv_value(value) for value in row])
+            count += 1
+        return count
+
+    def write_ndjson(self, output_file, columns, rows):
+        count = 0
+        for row in rows:
+            output_file.write(json.dumps(
+                dict(zip(columns, map(to_json_value, row))),
+                ensure_ascii=False,
+            ) + '\n')
+            count += 1
+        return count
+
+    def dump_file(self, file_name, output_dir):
+        """Выгружает таблицу файла, не загружая ее в память целиком.
+
+        Файл пишется во временный файл, который заменяет выгружаемый
+        только после успешной выгрузки.
+        """
+        model = FILES_MODELS[file_name]
+        columns = FILES_COLUMNS[file_name]
+        path = self.get_output_path(output_dir, file_name)
+        rows = model.objects.order_by('pk').values_list(*columns).iterator(
+            chunk_size=self.chunk_size
+        )
+        write = (
+            self.write_csv if self.format == CSV_FORMAT else self.write_ndjson
+        )
+        started = time.perf_counter()
+        temporary_path = path + '.tmp'
+        if self.gzip:
+            temporary_path = path[:-len(GZIP_SUFFIX)] + '.tmp' + GZIP_SUFFIX
+        with open_text_file(temporary_path, mode='w') as output_file:
+            count = write(output_file, columns, rows)
+        os.replace(temporary_path, path)
+        seconds = time.perf_counter() - started
+        self.stdout.write(
+            SUCCESS_MODEL_DUMP.format(
+                count=count,
+                model=model.__name__,
+                file=path,
+                seconds=seconds,
+                rate=count / max(seconds, 1e-9),
+            )
+        )
+
+    def dump_file_in_thread(self, file_name, output_dir):
+        try:
+            self.dump_file(file_name, output_dir)
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        if not os.path.isdir(output_dir):
+            raise CommandError(OUTPUT_DIR_ERROR.format(path=output_dir))
+        for option in ('chunk_size', 'workers'):
+            if options[option] < 1:
+                raise CommandError(POSITIVE_ERROR.format(option=option))
+        self.format = options['format']
+        self.gzip = options['gzip']
+        self.chunk_size = options['chunk_size']
+        file_names = self.get_file_names(options['file_name'])
+        if options['workers'] == 1:
+            for file_name in file_names:
+                self.dump_file(file_name, output_dir)
+            return
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = [
+                executor.submit(
+                    self.dump_file_in_thread, file_name, output_dir
+                )
+                for file_name in file_names
+            ]
+            for future in futures:
+                future.result()
@@ -1,9 +1,27 @@
 from typing import OrderedDict
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
+from django.db import connection, transaction
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from contextvars import copy_context
+from itertools import chain, islice
+from threading import Lock
 import os
 import csv
-from reviews.models import Category, Comment, Genre, Review, Title, User
+import gzip
+import hashlib
+import json
+import time
+from reviews.management.csv_validation import BatchValidator, to_python
+from reviews.models import (
+    SEARCH_INDEXES, Category, Comment, Genre, LoadCheckpoint, Review, Title,
+    User
+)
+from reviews.search import rebuild_search_index
+from reviews.signals import bulk_changed, suspend_rating_updates
 
 USER_FILE_NAME = 'users.csv'
 CATEGORY_FILE_NAME = 'category.csv'
@@ -22,10 +40,116 @@ FILES_MODELS = OrderedDict((
     (COMMENT_FILE_NAME, Comment),
 ))
 DEFAULT_CSV_FOLDER_PATH = os.path.join(settings.BASE_DIR, 'static', 'data')
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_WORKERS = 4
+REJECTS_SUFFIX = '.rejects.jsonl'
+GZIP_SUFFIX = '.gz'
+HASH_CHUNK_SIZE = 1024 * 1024
 FILE_NOT_EXIST_ERROR = 'Файла {file} не существует'
 FILE_NOT_CSV_ERROR = 'Файл {file} не соответствует расширению csv'
 UNEXPECTED_FILE_NAME_ERROR = 'Неизвестный файл {file}'
-SUCCESS_MODEL_LOAD = 'Успешно загружено {count} записей в {model}.'
+UNEXPECTED_COLUMN_ERROR = 'Файл {file}: неизвестная колонка {column}'
+BATCH_SIZE_ERROR = 'Размер пачки должен быть положительным числом'
+WORKERS_ERROR = 'Количество потоков должно быть положительным числом'
+ROW_VALUE_ERROR = (
+    'Файл {file}, запись {row}: некорректное значение {column}: {error}'
+)
+NO_PK_COLUMN_ERROR = 'Файл {file}: для --upsert нужна колонка id'
+ROW_LENGTH_ERROR = (
+    'Файл {file}, запись {row}: количество значений не совпадает с заголовком'
+)
+ROW_RELATION_ERROR = (
+    'Файл {file}, запись {row}: нет объекта {model} с id {pk}'
+)
+PROGRESS_MESSAGE = '{model}: {count} записей ({rate:.0f} записей/с)'
+SUCCESS_MODEL_LOAD = (
+    'Успешно загружено {count} записей в {model} '
+    'за {seconds:.2f} с ({rate:.0f} записей/с).'
+)
+SUCCESS_MODEL_UPSERT = (
+    'Обновлена таблица {model} за {seconds:.2f} с ({rate:.0f} записей/с): '
+    'добавлено {inserted}, изменено {updated}, без изменений {unchanged}, '
+    'удалено {deleted}.'
+)
+VALIDATION_ERROR = (
+    'Файл {file}: отклонено записей: {count}, список в файле {rejects}'
+)
+VALIDATION_STAGE_MESSAGE = 'Проверка файлов: {seconds:.2f} с'
+RESUME_MESSAGE = 'Файл {file}: продолжение загрузки после записи {row}'
+FILE_DONE_MESSAGE = 'Файл {file} уже загружен, пропускаем'
+STAGE_MESSAGE = 'Этап {number} ({files}): {seconds:.2f} с'
+RATING_STAGE_MESSAGE = 'Пересчет рейтинга: {seconds:.2f} с'
+
+
+@contextmanager
+def preserve_file_dates(fields):
+    """Сохраняет даты из файла в полях, заполняемых при создании записи."""
+    auto_fields = [
+        field for field in fields if getattr(field, 'auto_now_add', False)
+    ]
+    for field in auto_fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in auto_fields:
+            field.auto_now_add = True
+
+
+def open_text_file(file_path, mode):
+    """Открывает текстовый файл, сжатый gzip, если имя оканчивается на .gz.
+
+    Переводы строк не преобразуются, как требует модуль csv.
+    """
+    if file_path.endswith(GZIP_SUFFIX):
+        return gzip.open(
+            file_path, mode=mode + 't', encoding='utf-8', newline=''
+        )
+    return open(file_path, mode=mode, encoding='utf-8', newline='')
+
+
+def get_file_hash(file_path):
+    file_hash = hashlib.sha256()
+    with open(file_path, mode='rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+class Checkpoint:
+    """Прогресс загрузки csv файла.
+
+    Хранится в таблице LoadCheckpoint и содержит номер последней
+    сохраненной записи и хеш csv файла, поэтому после изменения файла
+    загрузка начинается заново. save() вызывается в транзакции пачки,
+    чтобы прогресс фиксировался вместе с ее записями.
+    """
+
+    def __init__(self, csv_file_path, upsert):
+        self.path = os.path.abspath(csv_file_path)
+        self.file_hash = get_file_hash(csv_file_path)
+        self.upsert = upsert
+        self.row = 0
+        self.done = False
+
+    def load(self):
+        state = LoadCheckpoint.objects.filter(
+            path=self.path, file_hash=self.file_hash, upsert=self.upsert
+        ).first()
+        if state is not None:
+            self.row, self.done = state.row, state.done
+
+    def save(self, row, done=False):
+        LoadCheckpoint.objects.update_or_create(
+            path=self.path,
+            defaults={
+                'file_hash': self.file_hash,
+                'upsert': self.upsert,
+                'row': row,
+                'done': done,
+            },
+        )
+        self.row, self.done = row, done
 
 
 class Command(BaseCommand):
@@ -36,13 +160,41 @@ class Command(BaseCommand):
             type=str,
             help='Путь от корня проекта до csv файла.'
         )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help=(
+                'Записывать только новые и измененные записи и удалять '
+                'отсутствующие в файле вместо полной перезаписи таблицы.'
+            )
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help=(
+                'Продолжить прерванную загрузку с последней сохраненной '
+                'пачки.'
+            )
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help='Количество файлов, загружаемых одновременно.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество записей, сохраняемых в одной транзакции.'
+        )
 
     def validate_file_path(self, file_path):
         if not os.path.isfile(file_path):
             raise CommandError(
                 FILE_NOT_EXIST_ERROR.format(file=file_path)
             )
-        if not file_path.endswith('.csv'):
+        if not file_path.endswith(('.csv', '.csv' + GZIP_SUFFIX)):
             raise CommandError(
                 FILE_NOT_CSV_ERROR.format(file=file_path)
             )
@@ -64,31 +216,11 @@ class Command(BaseCommand):
             ) for path in file_path
         ]
 
-    def get_model_objects(self, model, file_data):
-        related_fields = []
-        m_to_m_fields = []
-        objects = []
-        for field in model._meta.fields:
-            if field.is_relation:
-                if field.many_to_many:
-                    m_to_m_fields.append(field.name)
-                else:
-                    related_fields.append(field.name)
-        for row in file_data:
-            related_row = row.copy()
-            for row_field in row.keys():
-                if (
-                    row_field in related_fields
-                    and row_field not in m_to_m_fields
-                ):
-                    related_row[row_field], _ = model._meta.get_field(
-                        row_field
-                    ).related_model.objects.get_or_create(pk=row[row_field])
-            objects.append(model(**related_row))
-        return objects
-
     def get_model(self, csv_file_path):
-        model = FILES_MODELS.get(csv_file_path.split(os.sep)[-1])
+        file_name = csv_file_path.split(os.sep)[-1]
+        if file_name.endswith(GZIP_SUFFIX):
+            file_name = file_name[:-len(GZIP_SUFFIX)]
+        model = FILES_MODELS.get(file_name)
         if not model:
             raise CommandError(
                 UNEXPECTED_FILE_NAME_ERROR.format(
@@ -97,23 +229,424 @@ class Command(BaseCommand):
             )
         return model
 
-    def get_objects_from_csv_file(self, csv_file_path, model):
-        with open(csv_file_path, mode='r', encoding='utf-8') as csv_file:
-            reader = csv.DictReader(csv_file)
-            if csv_file_path.endswith(TITLE_GENRE_FILE_NAME):
-                return [model(**row) for row in reader]
-            return self.get_model_objects(model, reader)
+    def read_rows(self, csv_file_path):
+        """Построчно читает csv файл, в том числе сжатый gzip.
 
-    def handle(self, *args, **options):
-        csv_files = self.get_csv_files(options.get('file_path'))
-        for file_path in csv_files:
-            model = self.get_model(file_path)
-            model.objects.all().delete()
-            objects = self.get_objects_from_csv_file(file_path, model)
+        Возвращает пары из номера записи и списка значений, заголовок
+        файла возвращается первым с номером 0.
+        """
+        with open_text_file(csv_file_path, mode='r') as csv_file:
+            for number, values in enumerate(csv.reader(csv_file)):
+                if values:
+                    yield number, values
+
+    def get_fields(self, model, header, csv_file_path):
+        """Сопоставляет колонки файла с полями модели.
+
+        Колонки связей могут называться как по имени поля (author),
+        так и по имени столбца (title_id).
+        """
+        fields = []
+        for column in header:
+            try:
+                fields.append(model._meta.get_field(column))
+            except FieldDoesNotExist:
+                raise CommandError(
+                    UNEXPECTED_COLUMN_ERROR.format(
+                        file=csv_file_path, column=column
+                    )
+                )
+        return fields
+
+    def get_related_ids(self, fields):
+        """Загружает множества id моделей, на которые ссылаются колонки."""
+        return {
+            field: set(field.related_model.objects.values_list(
+                'pk', flat=True
+            ))
+            for field in fields if field.is_relation
+        }
+
+    def build_objects(self, model, fields, batch, related_ids,
+                      csv_file_path):
+        """Создает объекты модели по пачке записей файла."""
+        for row, values in batch:
+            if len(values) != len(fields):
+                raise CommandError(
+                    ROW_LENGTH_ERROR.format(file=csv_file_path, row=row)
+                )
+        columns = [
+            [self.to_value(field, row, values[index], csv_file_path)
+             for row, values in batch]
+            for index, field in enumerate(fields)
+        ]
+        for field, values in zip(fields, columns):
+            if field.is_relation:
+                self.check_relation(
+                    field, batch, values, related_ids[field], csv_file_path
+                )
+        return [
+            model(**{
+                field.attname: value for field, value in zip(fields, row)
+            })
+            for row in zip(*columns)
+        ]
+
+    def to_value(self, field, row, value, csv_file_path):
+        try:
+            return to_python(field, value)
+        except ValidationError as error:
+            raise CommandError(
+                ROW_VALUE_ERROR.format(
+                    file=csv_file_path,
+                    row=row,
+                    column=field.name,
+                    error=' '.join(error.messages),
+                )
+            )
+
+    def check_relation(self, field, batch, values, existing_ids,
+                       csv_file_path):
+        """Проверяет, что все связанные объекты пачки существуют."""
+        for (row, _), pk in zip(batch, values):
+            if pk is not None and pk not in existing_ids:
+                raise CommandError(
+                    ROW_RELATION_ERROR.format(
+                        file=csv_file_path,
+                        row=row,
+                        model=field.related_model.__name__,
+                        pk=pk,
+                    )
+                )
+
+    def batches(self, rows, batch_size):
+        rows = iter(rows)
+        while batch := list(islice(rows, batch_size)):
+            yield batch
+
+    def get_dependencies(self, model, models):
+        """Возвращает модели из models, на которые ссылается model."""
+        return {
+            field.related_model for field in model._meta.fields
+            if field.is_relation and field.related_model is not model
+        } & set(models)
+
+    def get_stages(self, csv_files):
+        """Разбивает файлы на этапы загрузки.
+
+        Файл попадает в этап, следующий за этапами всех файлов, на модели
+        которых он ссылается, поэтому файлы одного этапа независимы.
+        """
+        files = {self.get_model(path): path for path in csv_files}
+        stages = []
+        while files:
+            stage = [
+                model for model in files
+                if not self.get_dependencies(model, files.keys() - {model})
+            ]
+            stages.append([(files.pop(model), model) for model in stage])
+        return stages
+
+    def insert_batch(self, model, fields, objects, counts):
+        with preserve_file_dates(fields):
             model.objects.bulk_create(objects)
+        counts['inserted'] += len(objects)
+
+    def upsert_batch(self, model, fields, objects, counts):
+        """Сохраняет пачку, записывая только новые и измененные объекты.
+
+        Объекты сравниваются с записями в базе по id и значениям колонок.
+        """
+        names = [field.attname for field in fields if not field.primary_key]
+        existing = {
+            pk: values for pk, *values in model.objects.filter(
+                pk__in=[obj.pk for obj in objects]
+            ).values_list('pk', *names)
+        }
+        new_objects, changed_objects = [], []
+        for obj in objects:
+            if obj.pk not in existing:
+                new_objects.append(obj)
+            elif existing[obj.pk] != [getattr(obj, name) for name in names]:
+                changed_objects.append(obj)
+        self.insert_batch(model, fields, new_objects, counts)
+        if changed_objects:
+            model.objects.bulk_update(changed_objects, names)
+        counts['updated'] += len(changed_objects)
+        counts['unchanged'] += (
+            len(objects) - len(new_objects) - len(changed_objects)
+        )
+
+    def delete_missing(self, model, file_ids, batch_size, counts):
+        """Удаляет записи, которых нет в файле."""
+        missing_ids = list(
+            set(model.objects.values_list('pk', flat=True)) - file_ids
+        )
+        for batch in self.batches(missing_ids, batch_size):
+            with transaction.atomic():
+                model.objects.filter(pk__in=batch).delete()
+        counts['deleted'] += len(missing_ids)
+
+    def validate_file(self, csv_file_path, model, batch_size):
+        """Проверяет записи файла до загрузки в базу.
+
+        Отклоненные записи сохраняются рядом с файлом в формате JSON Lines.
+        Ссылки на модели, файлы которых загружаются в этом же запуске,
+        проверяются по id из этих файлов, остальные - по базе.
+        """
+        rows = self.read_rows(csv_file_path)
+        _, header = next(rows, (0, []))
+        fields = self.get_fields(model, header, csv_file_path)
+        related_ids = self.get_related_ids(
+            field for field in fields
+            if field.related_model not in self.file_ids
+        )
+        related_ids.update(
+            (field, self.file_ids[field.related_model]) for field in fields
+            if field.related_model in self.file_ids
+        )
+        validator = BatchValidator(
+            model, fields, related_ids, keep_ids=model in self.kept_ids
+        )
+        rejects_path = csv_file_path + REJECTS_SUFFIX
+        count = 0
+        with open(rejects_path, mode='w', encoding='utf-8') as rejects_file:
+            for rejects in chain(
+                map(validator.validate, self.batches(rows, batch_size)),
+                self.check_existing(model, validator),
+            ):
+                for reject in rejects:
+                    rejects_file.write(json.dumps(
+                        reject.as_dict(), ensure_ascii=False, default=str
+                    ) + '\n')
+                    count += 1
+        if count:
+            raise CommandError(
+                VALIDATION_ERROR.format(
+                    file=csv_file_path, count=count, rejects=rejects_path
+                )
+            )
+        os.remove(rejects_path)
+        if validator.keep_ids:
+            self.file_ids[model] = validator.ids
+
+    def check_existing(self, model, validator):
+        """Проверяет уникальные колонки файла по записям базы при --upsert.
+
+        Возвращает списки отклоненных записей по наборам колонок.
+        """
+        if not self.upsert or not validator.pk_field:
+            return
+        for unique_fields in validator.unique_fields:
+            yield validator.check_existing(
+                unique_fields,
+                model.objects.order_by().values_list(
+                    'pk', *(field.attname for field in unique_fields)
+                ).iterator(),
+            )
+
+    def get_referenced_models(self, stages):
+        """Возвращает модели, на которые ссылаются файлы этапов."""
+        return {
+            field.related_model
+            for stage in stages for _, model in stage
+            for field in model._meta.fields if field.is_relation
+        }
+
+    def validate_files(self, stages, batch_size, workers):
+        """Проверяет файлы по этапам загрузки в пуле потоков.
+
+        Останавливается на первом этапе с ошибками. id записей файла
+        хранятся, пока их проверяют ссылки из следующих этапов, а при
+        --upsert - до загрузки файла.
+        """
+        started = time.perf_counter()
+        self.file_ids = {}
+        for number, stage in enumerate(stages, start=1):
+            self.kept_ids = self.get_referenced_models(stages[number:])
+            if self.upsert:
+                self.kept_ids.update(
+                    model for stage in stages for _, model in stage
+                )
+            self.run_stage(self.validate_file, stage, batch_size, workers)
+            for model in self.file_ids.keys() - self.kept_ids:
+                del self.file_ids[model]
+        self.stdout.write(
+            VALIDATION_STAGE_MESSAGE.format(
+                seconds=time.perf_counter() - started
+            )
+        )
+
+    def skip_rows(self, rows, last_row):
+        """Пропускает записи, сохраненные до прерванной загрузки."""
+        for row, values in rows:
+            if row > last_row:
+                yield row, values
+
+    def load_file(self, csv_file_path, model, batch_size):
+        """Загружает файл в базу пачками, каждая в своей транзакции."""
+        checkpoint = Checkpoint(csv_file_path, self.upsert)
+        if self.resume:
+            with self.db_lock:
+                checkpoint.load()
+        if checkpoint.done:
+            self.stdout.write(FILE_DONE_MESSAGE.format(file=csv_file_path))
+            self.changed_models.add(model)
+            return
+        if checkpoint.row:
             self.stdout.write(
-                SUCCESS_MODEL_LOAD.format(
-                    count=len(objects),
+                RESUME_MESSAGE.format(file=csv_file_path, row=checkpoint.row)
+            )
+        rows = self.read_rows(csv_file_path)
+        _, header = next(rows, (0, []))
+        fields = self.get_fields(model, header, csv_file_path)
+        if self.upsert and model._meta.pk not in fields:
+            raise CommandError(
+                NO_PK_COLUMN_ERROR.format(file=csv_file_path)
+            )
+        counts = Counter(inserted=0, updated=0, unchanged=0, deleted=0)
+        started = time.perf_counter()
+        with self.db_lock:
+            if not self.upsert and not checkpoint.row:
+                model.objects.all().delete()
+            # Записи, которых нет в файле, удаляются до записи файла, чтобы
+            # их уникальные значения могли занять записи файла.
+            if self.upsert:
+                self.delete_missing(
+                    model, self.file_ids.pop(model), batch_size, counts
+                )
+            related_ids = self.get_related_ids(fields)
+        resumed = checkpoint.row
+        rows = self.skip_rows(rows, resumed)
+        for batch in self.batches(rows, batch_size):
+            objects = self.build_objects(
+                model, fields, batch, related_ids, csv_file_path
+            )
+            self.write_batch(
+                model, fields, objects, counts, checkpoint, batch[-1][0]
+            )
+            self.report_progress(model, counts, started)
+        self.report_file(model, counts, time.perf_counter() - started)
+        if resumed or any(
+            counts[name] for name in ('inserted', 'updated', 'deleted')
+        ):
+            self.changed_models.add(model)
+            if model in SEARCH_INDEXES:
+                with self.db_lock:
+                    rebuild_search_index(SEARCH_INDEXES[model])
+        with self.db_lock:
+            checkpoint.save(checkpoint.row, done=True)
+
+    def write_batch(self, model, fields, objects, counts, checkpoint,
+                    last_row):
+        """Сохраняет пачку и прогресс загрузки в одной транзакции."""
+        write = self.upsert_batch if self.upsert else self.insert_batch
+        with self.db_lock, transaction.atomic():
+            write(model, fields, objects, counts)
+            checkpoint.save(last_row)
+
+    def report_progress(self, model, counts, started):
+        if self.verbosity > 1:
+            count = sum(counts.values())
+            self.stdout.write(
+                PROGRESS_MESSAGE.format(
                     model=model.__name__,
+                    count=count,
+                    rate=self.get_rate(count, started),
+                )
+            )
+
+    def report_file(self, model, counts, seconds):
+        count = sum(counts.values()) - counts['deleted']
+        rate = count / max(seconds, 1e-9)
+        if not self.upsert:
+            self.stdout.write(
+                SUCCESS_MODEL_LOAD.format(
+                    count=count, model=model.__name__,
+                    seconds=seconds, rate=rate,
+                )
+            )
+            return
+        self.stdout.write(
+            SUCCESS_MODEL_UPSERT.format(
+                model=model.__name__, seconds=seconds, rate=rate, **counts
+            )
+        )
+
+    def run_in_thread(self, function, csv_file_path, model, batch_size):
+        try:
+            function(csv_file_path, model, batch_size)
+        finally:
+            connection.close()
+
+    def run_stage(self, function, stage, batch_size, workers):
+        """Обрабатывает независимые файлы этапа в пуле потоков.
+
+        function - проверка или загрузка одного файла.
+        """
+        if workers == 1 or len(stage) == 1:
+            for csv_file_path, model in stage:
+                function(csv_file_path, model, batch_size)
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    copy_context().run, self.run_in_thread, function,
+                    csv_file_path, model, batch_size
+                )
+                for csv_file_path, model in stage
+            ]
+            for future in futures:
+                future.result()
+
+    def get_rate(self, count, started):
+        return count / max(time.perf_counter() - started, 1e-9)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError(BATCH_SIZE_ERROR)
+        if options['workers'] < 1:
+            raise CommandError(WORKERS_ERROR)
+        self.verbosity = options['verbosity']
+        self.upsert = options['upsert']
+        self.resume = options['resume']
+        self.changed_models = set()
+        # SQLite допускает только одну пишущую транзакцию, поэтому запись
+        # в базу выполняется по очереди, а чтение файлов - параллельно.
+        self.db_lock = (
+            Lock() if connection.vendor == 'sqlite' else nullcontext()
+        )
+        csv_files = self.get_csv_files(options.get('file_path'))
+        stages = self.get_stages(csv_files)
+        self.validate_files(
+            stages, options['batch_size'], options['workers']
+        )
+        with suspend_rating_updates():
+            for number, stage in enumerate(stages, start=1):
+                started = time.perf_counter()
+                self.run_stage(
+                    self.load_file, stage, options['batch_size'],
+                    options['workers']
+                )
+                self.stdout.write(
+                    STAGE_MESSAGE.format(
+                        number=number,
+                        files=', '.join(
+                            os.path.basename(path) for path, _ in stage
+                        ),
+                        seconds=time.perf_counter() - started,
+                    )
+                )
+        if self.changed_models & {Title, Review}:
+            started = time.perf_counter()
+            Title.objects.all().rebuild_rating()
+            self.stdout.write(
+                RATING_STAGE_MESSAGE.format(
+                    seconds=time.perf_counter() - started
                 )
             )
+        for model in self.changed_models:
+            bulk_changed.send(sender=model)
+        LoadCheckpoint.objects.filter(
+            path__in=[os.path.abspath(path) for path in csv_files]
+        ).delete()
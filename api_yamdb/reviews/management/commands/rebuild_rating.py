@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Title
+from reviews.signals import bulk_changed
+
+SUCCESS_REBUILD = 'Рейтинг пересчитан для {count} произведений.'
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг всех произведений по их отзывам.'
+
+    def handle(self, *args, **options):
+        count = Title.objects.all().rebuild_rating()
+        bulk_changed.send(sender=Title)
+        self.stdout.write(SUCCESS_REBUILD.format(count=count))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import SEARCH_INDEXES
+from reviews.search import rebuild_search_index
+
+SUCCESS_REBUILD = 'Поисковый индекс {model} пересоздан.'
+
+
+class Command(BaseCommand):
+    help = 'Заполняет полнотекстовые индексы произведений, категорий и жанров.'
+
+    def handle(self, *args, **options):
+        for model, index_model in SEARCH_INDEXES.items():
+            rebuild_search_index(index_model)
+            self.stdout.write(SUCCESS_REBUILD.format(model=model.__name__))
@@ -0,0 +1,202 @@
+"""Проверка записей csv файлов перед загрузкой в базу данных.
+
+Записи проверяются пачками по колонкам: валидаторы поля вызываются
+один раз для каждого различного значения колонки, а ссылки на связанные
+объекты и уникальность проверяются операциями над множествами.
+"""
+from django.core.exceptions import ValidationError
+
+LENGTH_ERROR = 'Количество значений не совпадает с заголовком'
+NULL_ERROR = 'Обязательное значение'
+CHOICE_ERROR = 'Недопустимое значение'
+RELATION_ERROR = 'Нет объекта {model} с таким id'
+UNIQUE_ERROR = 'Повтор значения {columns} из записи {row}'
+EXISTING_UNIQUE_ERROR = (
+    'Значение {columns} в базе занято записью с id {pk}, которая остается '
+    'в файле'
+)
+
+
+def to_python(field, value):
+    """Преобразует строку csv файла в значение поля модели."""
+    if value == '' and field.null:
+        return None
+    if field.is_relation:
+        return field.target_field.to_python(value)
+    return field.to_python(value)
+
+
+def get_unique_fields(model, fields):
+    """Возвращает наборы колонок файла, значения которых уникальны."""
+    unique_fields = [(field,) for field in fields if field.unique]
+    for constraint in model._meta.constraints:
+        constraint_fields = tuple(
+            model._meta.get_field(name)
+            for name in getattr(constraint, 'fields', ())
+        )
+        if constraint_fields and set(constraint_fields) <= set(fields):
+            unique_fields.append(constraint_fields)
+    return unique_fields
+
+
+class Reject:
+    """Отклоненная запись csv файла."""
+
+    def __init__(self, row, column, value, error):
+        self.row = row
+        self.column = column
+        self.value = value
+        self.error = error
+
+    def as_dict(self):
+        return {
+            'row': self.row,
+            'column': self.column,
+            'value': self.value,
+            'error': self.error,
+        }
+
+
+class BatchValidator:
+    """Проверяет пачки записей одного csv файла.
+
+    related_ids - множества id связанных моделей по полям-ссылкам.
+    При keep_ids после проверки в ids остаются id принятых записей, по
+    которым проверяются ссылки из следующих файлов.
+    """
+
+    def __init__(self, model, fields, related_ids, keep_ids=True):
+        self.fields = fields
+        self.related_ids = related_ids
+        self.unique_fields = get_unique_fields(model, fields)
+        self.unique_values = {columns: {} for columns in self.unique_fields}
+        self.pk_field = model._meta.pk if model._meta.pk in fields else None
+        self.keep_ids = keep_ids and self.pk_field is not None
+        self.ids = set()
+
+    def validate(self, batch):
+        """Возвращает список отклоненных записей пачки."""
+        rejects = [
+            Reject(row, None, None, LENGTH_ERROR)
+            for row, values in batch if len(values) != len(self.fields)
+        ]
+        rejected_rows = {reject.row for reject in rejects}
+        batch = [(row, values) for row, values in batch
+                 if row not in rejected_rows]
+        columns = {}
+        for index, field in enumerate(self.fields):
+            column = {row: values[index] for row, values in batch}
+            columns[field] = self.convert(field, column, rejects)
+            self.check_values(field, columns[field], column, rejects)
+        rejected_rows = {reject.row for reject in rejects}
+        self.check_unique(columns, rejected_rows, rejects)
+        if self.keep_ids:
+            rejected_rows = {reject.row for reject in rejects}
+            self.ids.update(
+                pk for row, pk in columns[self.pk_field].items()
+                if row not in rejected_rows
+            )
+        return sorted(rejects, key=lambda reject: reject.row)
+
+    def convert(self, field, column, rejects):
+        """Преобразует колонку, преобразуя каждое различное значение один раз.
+
+        Возвращает словарь значений по номерам записей без ошибок.
+        """
+        converted, errors = {}, {}
+        for value in set(column.values()):
+            try:
+                converted[value] = to_python(field, value)
+            except ValidationError as error:
+                errors[value] = ' '.join(error.messages)
+        rejects.extend(
+            Reject(row, field.name, value, errors[value])
+            for row, value in column.items() if value in errors
+        )
+        return {
+            row: converted[value] for row, value in column.items()
+            if value in converted
+        }
+
+    def get_errors(self, field, values):
+        """Возвращает ошибки различных значений колонки."""
+        errors = {}
+        if None in values and not field.null:
+            errors[None] = NULL_ERROR
+        values = values - {None}
+        if field.choices:
+            choices = {choice for choice, _ in field.flatchoices}
+            errors.update(
+                dict.fromkeys(values - choices, CHOICE_ERROR)
+            )
+        if field.is_relation:
+            errors.update(dict.fromkeys(
+                values - self.related_ids[field],
+                RELATION_ERROR.format(model=field.related_model.__name__)
+            ))
+            return errors
+        for value in values - errors.keys():
+            try:
+                for validator in field.validators:
+                    validator(value)
+            except ValidationError as error:
+                errors[value] = ' '.join(error.messages)
+        return errors
+
+    def check_values(self, field, values, column, rejects):
+        errors = self.get_errors(field, set(values.values()))
+        rejects.extend(
+            Reject(row, field.name, column[row], errors[value])
+            for row, value in values.items() if value in errors
+        )
+
+    def check_unique(self, columns, rejected_rows, rejects):
+        """Проверяет уникальность значений в пределах всего файла."""
+        for unique_fields in self.unique_fields:
+            seen = self.unique_values[unique_fields]
+            rows = set(columns[unique_fields[0]]) - rejected_rows
+            for field in unique_fields[1:]:
+                rows &= columns[field].keys()
+            for row in sorted(rows):
+                key = tuple(columns[field][row] for field in unique_fields)
+                if None in key:
+                    continue
+                if key in seen:
+                    rejects.append(Reject(
+                        row,
+                        ', '.join(field.name for field in unique_fields),
+                        list(key),
+                        UNIQUE_ERROR.format(
+                            columns=', '.join(
+                                field.name for field in unique_fields
+                            ),
+                            row=seen[key][0],
+                        ),
+                    ))
+                else:
+                    seen[key] = (row, self.get_pk(columns, row))
+
+    def get_pk(self, columns, row):
+        if self.pk_field is None:
+            return None
+        return columns[self.pk_field].get(row)
+
+    def check_existing(self, unique_fields, existing):
+        """Проверяет уникальность значений файла по записям базы.
+
+        existing - пары из id и значений колонок записей базы. Записи,
+        которых нет в файле, удаляются до загрузки, а значение записи,
+        которая остается, может занять другая запись файла только после
+        ее изменения, поэтому такая запись файла отклоняется.
+        """
+        seen = self.unique_values[unique_fields]
+        columns = ', '.join(field.name for field in unique_fields)
+        rejects = []
+        for pk, *key in existing:
+            row, file_pk = seen.get(tuple(key), (None, None))
+            if row is not None and file_pk != pk and pk in self.ids:
+                rejects.append(Reject(
+                    row, columns, key,
+                    EXISTING_UNIQUE_ERROR.format(columns=columns, pk=pk),
+                ))
+        return rejects
@@ -0,0 +1,97 @@
+# Generated by Django 3.2 on 2026-10-18 19:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.search
+
+SEARCH_TABLES = (
+    ('reviews_title_fts', 'reviews_title', ('name', 'description')),
+    ('reviews_category_fts', 'reviews_category', ('name',)),
+    ('reviews_genre_fts', 'reviews_genre', ('name',)),
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for index_table, table, fields in SEARCH_TABLES:
+        columns = ', '.join(fields)
+        if vendor == 'sqlite':
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE {index_table} USING fts5('
+                f"{columns}, tokenize='unicode61')"
+            )
+            schema_editor.execute(
+                f'INSERT INTO {index_table} (rowid, {columns}) '
+                f'SELECT id, {columns} FROM {table}'
+            )
+        elif vendor == 'postgresql':
+            vector = " || ' ' || ".join(
+                f"COALESCE(({field})::text, '')" for field in fields
+            )
+            schema_editor.execute(
+                f'CREATE INDEX {index_table} ON {table} USING gin '
+                f"(to_tsvector('simple'::regconfig, {vector}))"
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for index_table, _, _ in SEARCH_TABLES:
+        if vendor == 'sqlite':
+            schema_editor.execute(f'DROP TABLE IF EXISTS {index_table}')
+        elif vendor == 'postgresql':
+            schema_editor.execute(f'DROP INDEX IF EXISTS {index_table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategorySearchIndex',
+            fields=[
+                ('document', reviews.search.FullTextField(db_column='reviews_category_fts')),
+                ('rank', models.FloatField()),
+                ('category', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='reviews.category')),
+                ('name', models.TextField()),
+            ],
+            options={
+                'db_table': 'reviews_category_fts',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='GenreSearchIndex',
+            fields=[
+                ('document', reviews.search.FullTextField(db_column='reviews_genre_fts')),
+                ('rank', models.FloatField()),
+                ('genre', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='reviews.genre')),
+                ('name', models.TextField()),
+            ],
+            options={
+                'db_table': 'reviews_genre_fts',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TitleSearchIndex',
+            fields=[
+                ('document', reviews.search.FullTextField(db_column='reviews_title_fts')),
+                ('rank', models.FloatField()),
+                ('title', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='reviews.title')),
+                ('name', models.TextField()),
+                ('description', models.TextField()),
+            ],
+            options={
+                'db_table': 'reviews_title_fts',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2 on 2026-10-18 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_outbox_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoadCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=1024, unique=True, verbose_name='Путь к файлу')),
+                ('file_hash', models.CharField(max_length=64, verbose_name='Хеш файла')),
+                ('upsert', models.BooleanField(verbose_name='Режим --upsert')),
+                ('row', models.PositiveBigIntegerField(verbose_name='Последняя сохраненная запись')),
+                ('done', models.BooleanField(default=False, verbose_name='Файл загружен')),
+            ],
+            options={
+                'verbose_name': 'Прогресс загрузки',
+                'verbose_name_plural': 'Прогресс загрузки',
+            },
+        ),
+    ]
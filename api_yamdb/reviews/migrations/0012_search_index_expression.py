@@ -0,0 +1,43 @@
+from django.db import migrations
+
+SEARCH_TABLES = (
+    ('reviews_title_fts', 'Title', ('name', 'description')),
+    ('reviews_category_fts', 'Category', ('name',)),
+    ('reviews_genre_fts', 'Genre', ('name',)),
+)
+
+
+def recreate_search_index(apps, schema_editor):
+    """Пересоздает индексы PostgreSQL по выражению SearchVector.
+
+    Выражение индекса собирается тем же компилятором, что и запрос
+    поиска, поэтому совпадает с ним и используется планировщиком.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    from reviews.search import SEARCH_CONFIG
+
+    for index_table, model_name, fields in SEARCH_TABLES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_table}')
+        schema_editor.add_index(
+            apps.get_model('reviews', model_name),
+            GinIndex(
+                SearchVector(*fields, config=SEARCH_CONFIG), name=index_table
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_load_checkpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            recreate_search_index, migrations.RunPython.noop
+        ),
+    ]
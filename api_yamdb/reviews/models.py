@@ -1,8 +1,15 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.core import validators
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from . import constants as const
+from .search import FullTextField, SearchQuerySet
 from .validators import validate_invalid_username, validate_year
 
 
@@ -36,6 +43,9 @@ class User(AbstractUser):
         default=USER,
     )
 
+    class Meta:
+        ordering = ('username',)
+
     @property
     def is_user(self):
         return self.role == self.USER
@@ -70,6 +80,10 @@ class AuthorTextPubDate(models.Model):
         return f'text: {self.text[:const.STRING_SHOW]} author: {self.author}'
 
 
+class NameSlugQuerySet(SearchQuerySet):
+    search_fields = ('name',)
+
+
 class NameSlug(models.Model):
     name = models.CharField(
         verbose_name='Название',
@@ -82,6 +96,8 @@ class NameSlug(models.Model):
         unique=True,
     )
 
+    objects = NameSlugQuerySet.as_manager()
+
     class Meta:
         abstract = True
         ordering = ('name',)
@@ -105,6 +121,76 @@ class Category(NameSlug):
         verbose_name_plural = 'Категории'
 
 
+# id произведений, удаляемых текущим вызовом delete(): оценки отзывов,
+# удаляемых вместе с ними, не исключаются из их рейтинга.
+deleting_titles = ContextVar('deleting_titles', default=frozenset())
+
+
+@contextmanager
+def title_deletion():
+    """Ограничивает отметки удаляемых произведений вызовом delete().
+
+    Отметки сбрасываются и при ошибке удаления.
+    """
+    token = deleting_titles.set(deleting_titles.get())
+    try:
+        yield
+    finally:
+        deleting_titles.reset(token)
+
+
+class TitleQuerySet(SearchQuerySet):
+    search_fields = ('name', 'description')
+
+    def delete(self):
+        with title_deletion():
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def change_rating(self, score_delta, count_delta):
+        """Сдвигает сумму и количество оценок, пересчитывая рейтинг.
+
+        Все выражения UPDATE вычисляются по прежним значениям строки,
+        поэтому рейтинг считается по сдвинутым сумме и количеству.
+        """
+        rating_sum = F('rating_sum') + score_delta
+        rating_count = F('rating_count') + count_delta
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=Case(
+                When(rating_count=-count_delta, then=None),
+                default=rating_sum / rating_count,
+            ),
+        )
+
+    def rebuild_rating(self):
+        """Пересчитывает рейтинг произведений по всем отзывам заново."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        with transaction.atomic(using=self.db):
+            self.update(
+                rating_sum=Coalesce(
+                    Subquery(
+                        reviews.annotate(total=Sum('score')).values('total')
+                    ),
+                    0,
+                    output_field=models.PositiveIntegerField(),
+                ),
+                rating_count=Coalesce(
+                    Subquery(
+                        reviews.annotate(total=Count('pk')).values('total')
+                    ),
+                    0,
+                    output_field=models.PositiveIntegerField(),
+                ),
+            )
+            return self.change_rating(0, 0)
+
+
 class Title(models.Model):
     name = models.CharField(
         verbose_name='Название',
@@ -119,25 +205,78 @@ class Title(models.Model):
         verbose_name='Категория',
         on_delete=models.SET_NULL,
         null=True,
+        db_index=False,
     )
     genre = models.ManyToManyField(Genre, verbose_name='Жанр')
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
+    rating = models.PositiveSmallIntegerField(
+        verbose_name='Рейтинг',
+        null=True,
+        editable=False,
+    )
+
+    objects = TitleQuerySet.as_manager()
+
+    RATING_FIELDS = ('rating_sum', 'rating_count', 'rating')
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
-        ordering = ('-year', 'name', 'description')
+        ordering = ('-year', 'name', 'id')
         default_related_name = 'titles'
+        indexes = (
+            models.Index(
+                fields=('-year', 'name', 'id'),
+                name='title_ordering_idx',
+            ),
+            models.Index(
+                fields=('category', '-year', 'name', 'id'),
+                name='title_category_ordering_idx',
+            ),
+        )
 
     def __str__(self):
         return (f'name: {self.name[:const.STRING_SHOW]} '
                 f'category: {self.category}')
 
+    def save(self, *args, **kwargs):
+        """Сохраняет произведение, не перезаписывая рейтинг.
+
+        Рейтинг обновляется только вместе с отзывами, поэтому при изменении
+        произведения его поля исключаются из запроса UPDATE.
+        """
+        if (
+            not self._state.adding
+            and not kwargs.get('force_insert')
+            and kwargs.get('update_fields') is None
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.RATING_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with title_deletion():
+            return super().delete(*args, **kwargs)
+
 
 class Review(AuthorTextPubDate):
     title = models.ForeignKey(
         Title,
         verbose_name='Произведение',
         on_delete=models.CASCADE,
+        db_index=False,
     )
     score = models.PositiveSmallIntegerField(
         verbose_name='Рейтинг',
@@ -154,6 +293,44 @@ class Review(AuthorTextPubDate):
                 name='unique_review',
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date'),
+                name='review_title_pub_date_idx',
+            ),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв и обновляет рейтинг произведения.
+
+        При переносе отзыва в другое произведение оценка исключается из
+        рейтинга прежнего произведения и добавляется в рейтинг нового.
+        """
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            loaded_score = getattr(self, '_loaded_score', None)
+            loaded_title_id = getattr(self, '_loaded_title_id', None)
+            titles = Title.objects.all()
+            if loaded_score is None:
+                titles.filter(pk=self.title_id).change_rating(self.score, 1)
+            elif loaded_title_id != self.title_id:
+                titles.filter(pk=loaded_title_id).change_rating(
+                    -loaded_score, -1
+                )
+                titles.filter(pk=self.title_id).change_rating(self.score, 1)
+            elif loaded_score != self.score:
+                titles.filter(pk=self.title_id).change_rating(
+                    self.score - loaded_score, 0
+                )
+            self._loaded_score = self.score
+            self._loaded_title_id = self.title_id
 
 
 class Comment(AuthorTextPubDate):
@@ -161,8 +338,141 @@ class Comment(AuthorTextPubDate):
         Review,
         verbose_name='Отзыв',
         on_delete=models.CASCADE,
+        db_index=False,
     )
 
     class Meta(AuthorTextPubDate.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date'),
+                name='comment_review_pub_date_idx',
+            ),
+        )
+
+
+class OutboxEmail(models.Model):
+    """Письмо с кодом подтверждения, ожидающее отправки.
+
+    Код подтверждения создается при отправке, поэтому для пользователя
+    хранится одно письмо, а повторная регистрация только переносит его
+    в начало очереди.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Получатель',
+        related_name='outbox_email',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'Неудачные попытки', default=0
+    )
+    next_attempt = models.DateTimeField(
+        'Следующая попытка', null=True, default=timezone.now
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Письма в очереди'
+        ordering = ('next_attempt',)
+        indexes = (
+            models.Index(
+                fields=('next_attempt',), name='outbox_next_attempt_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user.email} ({self.attempts})'
+
+
+class LoadCheckpoint(models.Model):
+    """Прогресс загрузки csv файла командой load_csv.
+
+    Сохраняется в одной транзакции с пачкой записей файла, поэтому
+    номер записи всегда соответствует данным в базе.
+    """
+
+    path = models.CharField(
+        'Путь к файлу', max_length=const.FILE_PATH_LENGTH, unique=True
+    )
+    file_hash = models.CharField('Хеш файла', max_length=64)
+    upsert = models.BooleanField('Режим --upsert')
+    row = models.PositiveBigIntegerField('Последняя сохраненная запись')
+    done = models.BooleanField('Файл загружен', default=False)
+
+    class Meta:
+        verbose_name = 'Прогресс загрузки'
+        verbose_name_plural = 'Прогресс загрузки'
+
+    def __str__(self):
+        return f'{self.path}: {self.row}'
+
+
+class SearchIndex(models.Model):
+    """Таблица полнотекстового индекса SQLite FTS5.
+
+    Создается миграцией только для SQLite, rowid совпадает с id объекта.
+    """
+
+    document = FullTextField()
+    rank = models.FloatField()
+
+    class Meta:
+        abstract = True
+        managed = False
+
+
+class TitleSearchIndex(SearchIndex):
+    title = models.OneToOneField(
+        Title,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_index',
+    )
+    name = models.TextField()
+    description = models.TextField()
+
+    class Meta(SearchIndex.Meta):
+        db_table = 'reviews_title_fts'
+
+
+class CategorySearchIndex(SearchIndex):
+    category = models.OneToOneField(
+        Category,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_index',
+    )
+    name = models.TextField()
+
+    class Meta(SearchIndex.Meta):
+        db_table = 'reviews_category_fts'
+
+
+class GenreSearchIndex(SearchIndex):
+    genre = models.OneToOneField(
+        Genre,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_index',
+    )
+    name = models.TextField()
+
+    class Meta(SearchIndex.Meta):
+        db_table = 'reviews_genre_fts'
+
+
+SEARCH_INDEXES = {
+    Title: TitleSearchIndex,
+    Category: CategorySearchIndex,
+    Genre: GenreSearchIndex,
+}
@@ -0,0 +1,138 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connections, models
+
+SEARCH_CONFIG = 'simple'
+SEARCH_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def to_fts_query(query):
+    """Преобразует строку поиска в запрос FTS5 по префиксам слов."""
+    return ' '.join(
+        f'"{token}"*' for token in SEARCH_TOKEN_PATTERN.findall(query)
+    )
+
+
+class FullTextField(models.TextField):
+    """Скрытый столбец таблицы FTS5, совпадающий с именем таблицы."""
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        self.db_column = cls._meta.db_table
+        super().contribute_to_class(cls, name, **kwargs)
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class SearchQuerySet(models.QuerySet):
+    """Полнотекстовый поиск с ранжированием результатов.
+
+    В SQLite используется индекс FTS5, связанный с моделью как
+    `search_index`, в PostgreSQL - `tsvector` по полям `search_fields`.
+    Для остальных СУБД выполняется поиск по вхождению подстроки.
+    """
+
+    search_fields = ()
+
+    def search(self, query):
+        vendor = connections[self.db].vendor
+        if vendor == 'sqlite':
+            fts_query = to_fts_query(query)
+            if not fts_query:
+                return self.none()
+            return self.filter(
+                search_index__document__match=fts_query
+            ).order_by('search_index__rank', *self.model._meta.ordering)
+        if vendor == 'postgresql':
+            from django.contrib.postgres.search import (
+                SearchQuery,
+                SearchRank,
+                SearchVector,
+            )
+
+            vector = SearchVector(*self.search_fields, config=SEARCH_CONFIG)
+            search_query = SearchQuery(query, config=SEARCH_CONFIG)
+            return self.annotate(
+                search_vector=vector,
+                search_rank=SearchRank(vector, search_query),
+            ).filter(search_vector=search_query).order_by(
+                '-search_rank', *self.model._meta.ordering
+            )
+        return self.filter(reduce(or_, (
+            models.Q(**{f'{field}__icontains': query})
+            for field in self.search_fields
+        )))
+
+
+def get_indexed_fields(index_model):
+    return [
+        field.column for field in index_model._meta.concrete_fields
+        if type(field) is models.TextField
+    ]
+
+
+def update_search_index(index_model, instance, created=False):
+    """Обновляет строку индекса FTS5 для сохраненного объекта."""
+    update_search_indexes(index_model, [instance], created)
+
+
+def update_search_indexes(index_model, instances, created=False):
+    """Обновляет строки индекса FTS5 для сохраненных объектов."""
+    if not instances:
+        return
+    connection = connections[instances[0]._state.db]
+    if connection.vendor != 'sqlite':
+        return
+    fields = get_indexed_fields(index_model)
+    table = connection.ops.quote_name(index_model._meta.db_table)
+    with connection.cursor() as cursor:
+        if not created:
+            cursor.executemany(
+                f'DELETE FROM {table} WHERE rowid = %s',
+                [[instance.pk] for instance in instances],
+            )
+        cursor.executemany(
+            f'INSERT INTO {table} (rowid, {", ".join(fields)}) '
+            f'VALUES (%s{", %s" * len(fields)})',
+            [
+                [instance.pk, *(getattr(instance, field) for field in fields)]
+                for instance in instances
+            ],
+        )
+
+
+def delete_search_index(index_model, instance):
+    """Удаляет строку индекса FTS5 удаленного объекта."""
+    connection = connections[instance._state.db]
+    if connection.vendor != 'sqlite':
+        return
+    table = connection.ops.quote_name(index_model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [instance.pk])
+
+
+def rebuild_search_index(index_model, using='default'):
+    """Заполняет индекс FTS5 заново по всем объектам модели."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    fields = ', '.join(get_indexed_fields(index_model))
+    table = connection.ops.quote_name(index_model._meta.db_table)
+    source = connection.ops.quote_name(
+        index_model._meta.pk.related_model._meta.db_table
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+        cursor.execute(
+            f'INSERT INTO {table} (rowid, {fields}) '
+            f'SELECT id, {fields} FROM {source}'
+        )
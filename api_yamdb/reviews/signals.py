@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from . import search
+from .models import (
+    SEARCH_INDEXES, Category, Genre, Review, Title, deleting_titles
+)
+from .slug_cache import NAME_SLUG_CACHES
+
+# Отправляется после массовой записи модели в обход save() и delete().
+bulk_changed = Signal()
+rating_updates_suspended = ContextVar(
+    'rating_updates_suspended', default=False
+)
+
+
+@contextmanager
+def suspend_rating_updates():
+    """Отключает пересчет рейтинга при удалении отзывов.
+
+    Используется при массовых операциях, после которых рейтинг
+    пересчитывается целиком.
+    """
+    token = rating_updates_suspended.set(True)
+    try:
+        yield
+    finally:
+        rating_updates_suspended.reset(token)
+
+
+@receiver(pre_delete, sender=Title)
+def mark_title_deleting(sender, instance, **kwargs):
+    """Запоминает удаляемое произведение, чтобы не пересчитывать рейтинг."""
+    deleting_titles.set(deleting_titles.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=Review)
+def decrease_title_rating(sender, instance, **kwargs):
+    """Исключает оценку удаленного отзыва из рейтинга произведения."""
+    if (
+        rating_updates_suspended.get()
+        or instance.title_id in deleting_titles.get()
+    ):
+        return
+    Title.objects.filter(pk=instance.title_id).change_rating(
+        -instance.score, -1
+    )
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def update_search_index(sender, instance, created, **kwargs):
+    """Обновляет полнотекстовый индекс сохраненного объекта."""
+    search.update_search_index(SEARCH_INDEXES[sender], instance, created)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def delete_search_index(sender, instance, **kwargs):
+    """Удаляет удаленный объект из полнотекстового индекса."""
+    search.delete_search_index(SEARCH_INDEXES[sender], instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def invalidate_name_slug_cache(sender, **kwargs):
+    """Сбрасывает кеш слагов после фиксации транзакции."""
+    transaction.on_commit(NAME_SLUG_CACHES[sender].invalidate)
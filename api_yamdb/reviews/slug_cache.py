@@ -0,0 +1,100 @@
+"""Кеш слагов и названий категорий и жанров."""
+import uuid
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Category, Genre
+
+NAME_SLUG_VERSION_KEY = 'name_slug_version:{model}'
+NAME_SLUG_FIELDS = ('id', 'name', 'slug')
+
+
+def is_enabled():
+    return settings.NAME_SLUG_CACHE
+
+
+class NameSlugCache:
+    """Соответствия slug -> id и id -> (name, slug) для модели.
+
+    Таблица загружается одним запросом и хранится в памяти процесса
+    вместе с версией из кеша Django. Изменение записей меняет версию,
+    и процессы с общим кешем (CACHES) загружают таблицу заново. Версия
+    проверяется один раз за запрос функцией refresh_caches(), поиск по
+    таблице обращается к кешу Django, только если она не загружена.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = NAME_SLUG_VERSION_KEY.format(
+            model=model._meta.label_lower
+        )
+        self.version = None
+        self.ids = {}
+        self.rows = {}
+        self.lock = Lock()
+
+    def get_version(self):
+        cache.add(self.version_key, uuid.uuid4().hex, timeout=None)
+        return cache.get(self.version_key)
+
+    def refresh(self, version=None):
+        """Загружает таблицу заново, если ее версия изменилась."""
+        if version is None:
+            version = self.get_version()
+        if version == self.version:
+            return
+        with self.lock:
+            if version == self.version:
+                return
+            rows = {
+                pk: (name, slug) for pk, name, slug in
+                self.model.objects.values_list(*NAME_SLUG_FIELDS)
+            }
+            self.ids = {slug: pk for pk, (_, slug) in rows.items()}
+            self.rows = rows
+            self.version = version
+
+    def invalidate(self):
+        self.version = None
+        cache.delete(self.version_key)
+
+    def ensure_loaded(self):
+        if self.version is None:
+            self.refresh()
+
+    def get_ids(self, slugs):
+        """Возвращает id известных слагов."""
+        self.ensure_loaded()
+        return {slug: self.ids[slug] for slug in slugs if slug in self.ids}
+
+    def get_id(self, slug):
+        self.ensure_loaded()
+        return self.ids.get(slug)
+
+    def get_object(self, pk):
+        """Возвращает объект модели по id без запроса к базе данных."""
+        if pk is None:
+            return None
+        self.ensure_loaded()
+        if pk not in self.rows:
+            return None
+        return self.model.from_db(
+            self.model.objects.db, NAME_SLUG_FIELDS, (pk, *self.rows[pk])
+        )
+
+
+NAME_SLUG_CACHES = {
+    Category: NameSlugCache(Category),
+    Genre: NameSlugCache(Genre),
+}
+
+
+def refresh_caches():
+    """Проверяет версии всех таблиц одним обращением к кешу Django."""
+    versions = cache.get_many(
+        model_cache.version_key for model_cache in NAME_SLUG_CACHES.values()
+    )
+    for model_cache in NAME_SLUG_CACHES.values():
+        model_cache.refresh(versions.get(model_cache.version_key))
@@ -0,0 +1,141 @@
+"""Параллельное чтение и запись при разных настройках базы данных.
+
+Потоки-читатели запрашивают GET /api/v1/titles/, потоки-писатели
+регистрируют пользователей через POST /api/v1/auth/signup/. Для SQLite
+сравниваются журнал по умолчанию и WAL с PRAGMA из настроек, а также
+соединение на каждый запрос и постоянные соединения (CONN_MAX_AGE).
+Для PostgreSQL задайте переменные окружения DB_ENGINE=postgresql, DB_NAME
+и другие - сравниваются только режимы соединений.
+Запуск из корня проекта: python benchmarks/bench_database.py --requests 200
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import report, setup_test_database
+
+WAL_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'temp_store': 'memory',
+}
+SQLITE_MODES = (
+    ('журнал delete', {'journal_mode': 'delete'}, 0),
+    ('журнал delete, CONN_MAX_AGE=60', {'journal_mode': 'delete'}, 60),
+    ('WAL', WAL_PRAGMAS, 0),
+    ('WAL, CONN_MAX_AGE=60', WAL_PRAGMAS, 60),
+)
+POSTGRESQL_MODES = (
+    ('postgresql', {}, 0),
+    ('postgresql, CONN_MAX_AGE=60', {}, 60),
+)
+
+
+def fill_titles(count):
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000, category=category)
+        for idx in range(count)
+    )
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title_id, genre_id=genre.pk)
+        for title_id in Title.objects.values_list('pk', flat=True)
+    )
+
+
+def read(client, idx, prefix):
+    return client.get('/api/v1/titles/')
+
+
+def write(client, idx, prefix):
+    return client.post('/api/v1/auth/signup/', data={
+        'username': f'{prefix}{idx}',
+        'email': f'{prefix}{idx}@yamdb.fake',
+    })
+
+
+def run_worker(request, count, prefix):
+    """Выполняет запросы из одного потока, как поток веб-сервера."""
+    from django.db import connection
+    from django.test import Client
+
+    client = Client(raise_request_exception=False)
+    errors = 0
+    started = time.perf_counter()
+    try:
+        for idx in range(count):
+            if request(client, idx, prefix).status_code >= 400:
+                errors += 1
+    finally:
+        connection.close()
+    return request, time.perf_counter() - started, errors
+
+
+def run_mode(mode, args):
+    """Запускает читателей и писателей одновременно."""
+    workers = [
+        (read, '') for _ in range(args.readers)
+    ] + [
+        (write, f'mode{mode}writer{idx}user') for idx in range(args.writers)
+    ]
+    with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+        results = list(executor.map(
+            lambda worker: run_worker(worker[0], args.requests, worker[1]),
+            workers,
+        ))
+    for request in (read, write):
+        results_kind = [result for result in results if result[0] is request]
+        report(
+            f'  {request.__name__}, ошибок: '
+            f'{sum(result[2] for result in results_kind)}',
+            max(result[1] for result in results_kind),
+            args.requests * len(results_kind),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--titles', type=int, default=100)
+    args = parser.parse_args()
+    directory = tempfile.TemporaryDirectory()
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.db import connection
+
+    database = connection.settings_dict
+    modes = POSTGRESQL_MODES
+    if connection.vendor == 'sqlite':
+        database['TEST']['NAME'] = os.path.join(directory.name, 'db.sqlite3')
+        modes = SQLITE_MODES
+    setup_test_database()
+
+    logging.disable(logging.WARNING)
+    fill_titles(args.titles)
+    connection.close()
+    print(
+        f'Читателей: {args.readers}, писателей: {args.writers}, '
+        f'запросов в потоке: {args.requests}'
+    )
+    for mode, (name, pragmas, max_age) in enumerate(modes):
+        settings.SQLITE_PRAGMAS = pragmas
+        database['CONN_MAX_AGE'] = max_age
+        print(name)
+        run_mode(mode, args)
+    directory.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Отправка писем подтверждения: по одному против пачек через одно соединение.
+
+Письма пишутся файловым почтовым бэкендом во временную директорию.
+Запуск из корня проекта: python benchmarks/bench_emails.py --users 2000
+"""
+import argparse
+import tempfile
+import time
+
+from utils import report, setup_test_database
+
+
+def create_users(count):
+    from reviews.models import User
+
+    User.objects.bulk_create(
+        User(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        for idx in range(count)
+    )
+    return list(User.objects.all())
+
+
+def send_with_render_to_string(users):
+    """Прежний способ: шаблоны загружаются заново для каждого письма."""
+    from django.conf import settings
+    from django.contrib.auth.tokens import default_token_generator
+    from django.core.mail import send_mail
+    from django.template.loader import render_to_string
+
+    from api.utils import CONFIRMATION_EMAIL_BODY, CONFIRMATION_EMAIL_SUBJECT
+
+    for user in users:
+        send_mail(
+            render_to_string(CONFIRMATION_EMAIL_SUBJECT).strip(),
+            render_to_string(CONFIRMATION_EMAIL_BODY, {
+                'user': user,
+                'confirmation_code': default_token_generator.make_token(user),
+            }),
+            settings.DEFAULT_FROM_EMAIL,
+            [user.email],
+        )
+
+
+def send_one_by_one(users):
+    from django.contrib.auth.tokens import default_token_generator
+
+    from api.utils import send_confirmation_email
+
+    for user in users:
+        send_confirmation_email(
+            user, default_token_generator.make_token(user)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--chunk-size', type=int, default=100)
+    args = parser.parse_args()
+    setup_test_database()
+    from django.conf import settings
+
+    from api.utils import send_confirmation_emails
+
+    users = create_users(args.users)
+    print(f'Писем: {args.users}')
+    for name, func in (
+        (
+            'send_mail и render_to_string для каждого',
+            send_with_render_to_string,
+        ),
+        ('send_confirmation_email для каждого', send_one_by_one),
+        (
+            f'send_confirmation_emails по {args.chunk_size}',
+            lambda users: send_confirmation_emails(users, args.chunk_size),
+        ),
+    ):
+        with tempfile.TemporaryDirectory() as path:
+            settings.EMAIL_FILE_PATH = path
+            start = time.perf_counter()
+            func(users)
+            report(name, time.perf_counter() - start, args.users)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Выгрузка всех произведений: NDJSON поток против постраничного API.
+
+Запуск из корня проекта: python benchmarks/bench_export.py --titles 50000
+"""
+import argparse
+import time
+import tracemalloc
+
+from utils import report, setup_test_database
+
+PAGE_SIZE = 100
+
+
+def fill_titles(count, batch_size=5000):
+    from reviews.models import Category, Genre, Title
+
+    categories = [
+        Category.objects.create(name=f'Категория {idx}', slug=f'cat-{idx}')
+        for idx in range(10)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(20)
+    ]
+    for start in range(0, count, batch_size):
+        Title.objects.bulk_create(
+            Title(
+                name=f'Произведение {idx}', year=1900 + idx % 120,
+                category=categories[idx % 10],
+            ) for idx in range(start, min(start + batch_size, count))
+        )
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title_id, genre_id=genre.pk)
+        for title_id in Title.objects.values_list('pk', flat=True)
+        for genre in genres[title_id % 20:title_id % 20 + 2]
+    )
+
+
+def get_admin_client():
+    from rest_framework.test import APIClient
+    from reviews.models import User
+
+    client = APIClient()
+    client.force_authenticate(
+        User.objects.create(username='admin', email='a@a.ru', role='admin')
+    )
+    return client
+
+
+def export_stream(client):
+    response = client.get('/api/v1/titles/export/')
+    return sum(
+        chunk.count(b'\n') for chunk in response.streaming_content
+    )
+
+
+def export_pages(client):
+    count = 0
+    url = f'/api/v1/titles/?pagination=cursor&limit={PAGE_SIZE}'
+    while url:
+        page = client.get(url).json()
+        count += len(page['results'])
+        url = page['next']
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=50000)
+    args = parser.parse_args()
+    setup_test_database()
+    fill_titles(args.titles)
+    client = get_admin_client()
+    print(f'Произведений: {args.titles}')
+    for name, func in (
+        ('titles/export/ (NDJSON поток)', export_stream),
+        (f'titles/ по {PAGE_SIZE} на страницу', export_pages),
+    ):
+        start = time.perf_counter()
+        count = func(client)
+        report(name, time.perf_counter() - start, count)
+    tracemalloc.start()
+    export_stream(client)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'Пик памяти при выгрузке потоком: {peak / 1024 / 1024:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""Скорость загрузки csv файлов командой load_csv.
+
+Сравниваются разные размеры пачки и количество потоков, повторная
+загрузка тех же файлов с --upsert и выгрузка командой dump_csv.
+
+Запуск из корня проекта: python benchmarks/bench_load_csv.py --reviews 200000
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from io import StringIO
+
+from utils import report, setup_test_database
+
+RUNS = ((100, 1), (1000, 1), (5000, 1), (1000, 4))
+DUMP_RUNS = (
+    {'workers': 1},
+    {'workers': 4},
+    {'workers': 4, 'gzip': True},
+    {'workers': 4, 'format': 'ndjson'},
+)
+
+
+def write_csv(folder, file_name, header, rows):
+    path = os.path.join(folder, file_name)
+    with open(path, mode='w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return path
+
+
+def make_csv_files(folder, reviews):
+    """Создает набор csv файлов с заданным количеством отзывов."""
+    random.seed(0)
+    users = max(reviews // 20, 10)
+    titles = max(reviews // 10, 10)
+    write_csv(
+        folder, 'users.csv',
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+        ((pk, f'user{pk}', f'user{pk}@yamdb.fake', 'user', '', '', '')
+         for pk in range(1, users + 1))
+    )
+    write_csv(
+        folder, 'category.csv', ('id', 'name', 'slug'),
+        ((pk, f'Категория {pk}', f'category{pk}') for pk in range(1, 11))
+    )
+    write_csv(
+        folder, 'genre.csv', ('id', 'name', 'slug'),
+        ((pk, f'Жанр {pk}', f'genre{pk}') for pk in range(1, 21))
+    )
+    write_csv(
+        folder, 'titles.csv', ('id', 'name', 'year', 'category'),
+        ((pk, f'Произведение {pk}', 1900 + pk % 120, pk % 10 + 1)
+         for pk in range(1, titles + 1))
+    )
+    write_csv(
+        folder, 'genre_title.csv', ('id', 'title_id', 'genre_id'),
+        ((pk, pk, pk % 20 + 1) for pk in range(1, titles + 1))
+    )
+    write_csv(
+        folder, 'review.csv',
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        ((pk, pk % titles + 1, f'Отзыв {pk}', pk // titles % users + 1,
+          random.randint(1, 10), '2021-01-01T00:00:00Z')
+         for pk in range(1, reviews + 1))
+    )
+    write_csv(
+        folder, 'comments.csv',
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        ((pk, pk, f'Комментарий {pk}', pk % users + 1, '2021-01-01T00:00:00Z')
+         for pk in range(1, reviews + 1))
+    )
+    return reviews * 2 + titles * 2 + users + 30
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--reviews', type=int, default=50000)
+    args = parser.parse_args()
+    setup_test_database()
+
+    from django.core.management import call_command
+    from reviews.management.commands.load_csv import FILES_MODELS
+
+    with tempfile.TemporaryDirectory() as folder:
+        rows = make_csv_files(folder, args.reviews)
+        paths = [os.path.join(folder, name) for name in FILES_MODELS]
+        print(f'Записей во всех файлах: {rows}')
+        for batch_size, workers in RUNS:
+            call_command('flush', interactive=False, verbosity=0)
+            start = time.perf_counter()
+            call_command(
+                'load_csv', *paths, batch_size=batch_size, workers=workers,
+                stdout=StringIO()
+            )
+            report(
+                f'load_csv --batch-size {batch_size} --workers {workers}',
+                time.perf_counter() - start, rows,
+            )
+        start = time.perf_counter()
+        call_command('load_csv', *paths, upsert=True, stdout=StringIO())
+        report(
+            'load_csv --upsert без изменений',
+            time.perf_counter() - start, rows,
+        )
+        for options in DUMP_RUNS:
+            with tempfile.TemporaryDirectory() as output_dir:
+                start = time.perf_counter()
+                call_command(
+                    'dump_csv', output_dir, stdout=StringIO(), **options
+                )
+                report(
+                    'dump_csv ' + ' '.join(
+                        f'--{name}' if value is True else f'--{name} {value}'
+                        for name, value in options.items()
+                    ),
+                    time.perf_counter() - start, rows,
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Сравнение полнотекстового поиска произведений с поиском по подстроке.
+
+Запуск из корня проекта: python benchmarks/bench_search.py --titles 100000
+"""
+import argparse
+import random
+
+from utils import measure, report, setup_test_database
+
+SYLLABLES = (
+    'ка', 'ро', 'ми', 'ту', 'ле', 'на', 'зо', 'ви', 'ша', 'до', 'гу', 'бе',
+)
+WORDS = tuple(
+    first + second + third
+    for first in SYLLABLES for second in SYLLABLES for third in SYLLABLES
+)
+QUERIES = ('камиту', 'роле зови', 'шадо')
+
+
+def fill_titles(count, batch_size=5000):
+    from reviews.models import Category, Title, TitleSearchIndex
+    from reviews.search import rebuild_search_index
+
+    category = Category.objects.create(name='Фильм', slug='movie')
+    random.seed(0)
+    for start in range(0, count, batch_size):
+        Title.objects.bulk_create(
+            Title(
+                name=' '.join(random.sample(WORDS, 3)),
+                description=' '.join(random.choices(WORDS, k=20)),
+                year=1900 + idx % 120,
+                category=category,
+            ) for idx in range(start, min(start + batch_size, count))
+        )
+    rebuild_search_index(TitleSearchIndex)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=50000)
+    args = parser.parse_args()
+    setup_test_database()
+
+    from django.db.models import Q
+    from reviews.models import Title
+
+    fill_titles(args.titles)
+    print(f'Произведений: {args.titles}')
+    for query in QUERIES:
+        substring = Title.objects.filter(
+            Q(name__icontains=query) | Q(description__icontains=query)
+        )
+        full_text = Title.objects.search(query)
+        for name, queryset in (
+            ('icontains', substring), ('fts5', full_text),
+        ):
+            report(
+                f'{name} "{query}": count + first page',
+                measure(lambda: (queryset.count(), list(queryset[:10]))),
+            )
+
+
+if __name__ == '__main__':
+    main()
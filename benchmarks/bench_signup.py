@@ -0,0 +1,77 @@
+"""Параллельные регистрации: повторные запросы и занятые логины.
+
+Каждый пользователь регистрируется несколько раз, а для каждого логина
+есть регистрация с другим email, которая должна быть отклонена.
+Регистрации выполняются в пуле потоков на файловой базе SQLite в
+режиме WAL, чтобы потоки ждали блокировку записи.
+Запуск из корня проекта: python benchmarks/bench_signup.py --users 500
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import report, setup_test_database
+
+WAL_PRAGMAS = {'journal_mode': 'wal', 'busy_timeout': 5000}
+
+
+def signup(data):
+    from django.db import connection
+    from django.test import Client
+
+    try:
+        return Client(raise_request_exception=False).post(
+            '/api/v1/auth/signup/', data=data
+        ).status_code
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+    directory = tempfile.TemporaryDirectory()
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.db import connection
+
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['TEST']['NAME'] = os.path.join(
+            directory.name, 'db.sqlite3'
+        )
+        settings.SQLITE_PRAGMAS = WAL_PRAGMAS
+    setup_test_database()
+    connection.close()
+    logging.disable(logging.WARNING)
+    requests = [
+        {'username': f'user{idx}', 'email': f'user{idx}@yamdb.fake'}
+        for idx in range(args.users)
+    ] * args.repeats + [
+        {'username': f'user{idx}', 'email': f'other{idx}@yamdb.fake'}
+        for idx in range(args.users)
+    ]
+    print(f'Регистраций: {len(requests)}, потоков: {args.workers}')
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        statuses = Counter(executor.map(signup, requests))
+    report(
+        'signup: ' + ', '.join(
+            f'{status}: {count}' for status, count in sorted(statuses.items())
+        ),
+        time.perf_counter() - started,
+        len(requests),
+    )
+    directory.cleanup()
+
+
+if __name__ == '__main__':
+    main()
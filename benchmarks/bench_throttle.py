@@ -0,0 +1,66 @@
+"""Ограничение частоты запросов аутентификации.
+
+Сравнивает расход токена в памяти процесса и в кеше Django, а также
+отклоненный запрос к auth/token/ с запросом с неверным кодом.
+Запуск из корня проекта: python benchmarks/bench_throttle.py --requests 2000
+"""
+import argparse
+import logging
+
+from utils import measure, report, setup_test_database
+
+
+def consume_many(storage, count):
+    for idx in range(count):
+        storage.consume(f'key{idx % 100}', 10, 1, idx)
+
+
+def post_many(client, count, username):
+    for _ in range(count):
+        client.post('/api/v1/auth/token/', data={
+            'username': username, 'confirmation_code': 'wrong'
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    setup_test_database()
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+
+    from api.throttling import CacheBucketStorage, MemoryBucketStorage
+    from reviews.models import User
+
+    count = args.requests
+    print(f'Операций: {count}')
+    for name, storage in (
+        ('корзины в памяти процесса', MemoryBucketStorage()),
+        ('корзины в кеше default', CacheBucketStorage(caches['default'])),
+    ):
+        report(name, measure(lambda: consume_many(storage, count)), count)
+
+    logging.disable(logging.WARNING)
+    User.objects.create(username='user', email='user@yamdb.fake')
+    client = APIClient()
+    report(
+        'auth/token/ с неверным кодом',
+        measure(lambda: post_many(client, count, 'user'), repeat=3),
+        count,
+    )
+    with override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'auth_ip': '1/hour', 'auth_username': None},
+    }):
+        report(
+            'auth/token/ отклонен ограничением',
+            measure(lambda: post_many(client, count, 'user'), repeat=3),
+            count,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+OBJECTS_COUNT = 12
+
+
+@pytest.fixture
+def catalogue(django_user_model, admin):
+    categories = [
+        Category.objects.create(name=f'Категория {idx}', slug=f'cat-{idx}')
+        for idx in range(OBJECTS_COUNT)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(OBJECTS_COUNT)
+    ]
+    titles = []
+    for idx in range(OBJECTS_COUNT):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000 + idx,
+            category=categories[idx],
+        )
+        title.genre.set(genres[idx:idx + 2])
+        titles.append(title)
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        ) for idx in range(OBJECTS_COUNT)
+    ]
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='text', score=5
+        ) for author in authors
+    ]
+    comments = [
+        Comment.objects.create(review=reviews[0], author=author, text='text')
+        for author in authors
+    ]
+    return {
+        'title': titles[0].pk,
+        'review': reviews[0].pk,
+        'comment': comments[0].pk,
+        'username': authors[0].username,
+        'code': default_token_generator.make_token(authors[0]),
+    }
+
+
+@pytest.fixture
+def author_client(catalogue, django_user_model):
+    client = APIClient()
+    token = AccessToken.for_user(
+        django_user_model.objects.get(username=catalogue['username'])
+    )
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
@@ -0,0 +1,132 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db.models.signals import pre_delete
+
+from reviews.models import Review, Title
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_reviews(self, admin_client, admin, user_client,
+                                       user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения обновляется при создании '
+            'отзыва.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 10}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения обновляется при изменении '
+            'оценки отзыва.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) == 10, (
+            'Проверьте, что рейтинг произведения обновляется при удалении '
+            'отзыва.'
+        )
+
+        Review.objects.all().delete()
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Рейтинг произведения без отзывов должен быть `None`.'
+        )
+
+    def test_02_rebuild_rating_command(self, admin_client, admin,
+                                       user_client, user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+
+        call_command('rebuild_rating')
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            10, 2, 5
+        )
+        assert Title.objects.get(pk=titles[1]['id']).rating is None
+
+    def test_03_review_moved_to_other_title(self, admin_client, admin,
+                                            user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        review = Review.objects.get(pk=reviews[1]['id'])
+        review.title_id = titles[1]['id']
+        review.score = 9
+        review.save()
+        old_title = Title.objects.get(pk=titles[0]['id'])
+        new_title = Title.objects.get(pk=titles[1]['id'])
+        assert (
+            old_title.rating_sum, old_title.rating_count, old_title.rating
+        ) == (5, 1, 5), (
+            'Проверьте, что оценка перенесенного отзыва исключается из '
+            'рейтинга прежнего произведения.'
+        )
+        assert (
+            new_title.rating_sum, new_title.rating_count, new_title.rating
+        ) == (9, 1, 9), (
+            'Проверьте, что оценка перенесенного отзыва добавляется в '
+            'рейтинг нового произведения.'
+        )
+
+    @pytest.mark.parametrize('delete', (
+        lambda title: title.delete(),
+        lambda title: Title.objects.filter(pk=title.pk).delete(),
+    ))
+    def test_04_failed_title_delete(self, admin_client, admin, user_client,
+                                    user, delete):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+
+        def fail(**kwargs):
+            raise RuntimeError
+
+        pre_delete.connect(fail, sender=Title)
+        try:
+            with pytest.raises(RuntimeError):
+                delete(title)
+        finally:
+            pre_delete.disconnect(fail, sender=Title)
+
+        Review.objects.get(pk=reviews[1]['id']).delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            5, 1, 5
+        ), (
+            'Проверьте, что после неудачного удаления произведения оценки '
+            'его удаленных отзывов исключаются из рейтинга.'
+        )
@@ -0,0 +1,130 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+from tests.fixtures.fixture_catalogue import OBJECTS_COUNT
+
+TITLES_URL = '/api/v1/titles/'
+TITLE_DETAIL_URL = '/api/v1/titles/{title}/'
+REVIEWS_URL = '/api/v1/titles/{title}/reviews/'
+REVIEW_DETAIL_URL = '/api/v1/titles/{title}/reviews/{review}/'
+COMMENTS_URL = '/api/v1/titles/{title}/reviews/{review}/comments/'
+COMMENT_DETAIL_URL = (
+    '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/'
+)
+BULK_TITLES_URL = '/api/v1/titles/bulk/'
+EXPORT_TITLES_URL = '/api/v1/titles/export/'
+TITLE_DATA = {
+    'name': 'Новое произведение', 'year': 2000, 'genre': ['genre-0'],
+    'category': 'cat-0',
+}
+QUERY_BUDGETS = (
+    ('client', 'get', TITLES_URL, None, 3),
+    ('client', 'get', TITLES_URL + '?genre=genre-1&year=2001', None, 3),
+    ('client', 'get', TITLES_URL + '?search=Произведение', None, 3),
+    ('client', 'get', TITLE_DETAIL_URL, None, 2),
+    ('admin_client', 'post', TITLES_URL, TITLE_DATA, 9),
+    ('admin_client', 'patch', TITLE_DETAIL_URL, TITLE_DATA, 12),
+    ('admin_client', 'delete', TITLE_DETAIL_URL, None, 11),
+    ('admin_client', 'post', BULK_TITLES_URL,
+     [TITLE_DATA, {**TITLE_DATA, 'id': '{title}'}], 13),
+    ('admin_client', 'get', EXPORT_TITLES_URL, None, 6),
+    ('client', 'get', '/api/v1/categories/', None, 2),
+    ('client', 'get', '/api/v1/categories/?search=1', None, 2),
+    ('admin_client', 'post', '/api/v1/categories/',
+     {'name': 'Новая', 'slug': 'new'}, 5),
+    ('admin_client', 'delete', '/api/v1/categories/cat-0/', None, 7),
+    ('client', 'get', '/api/v1/genres/', None, 2),
+    ('admin_client', 'post', '/api/v1/genres/',
+     {'name': 'Новый', 'slug': 'new'}, 5),
+    ('admin_client', 'delete', '/api/v1/genres/genre-0/', None, 6),
+    ('client', 'get', REVIEWS_URL, None, 3),
+    ('client', 'get', REVIEW_DETAIL_URL, None, 1),
+    ('admin_client', 'post', REVIEWS_URL, {'text': 'text', 'score': 3}, 6),
+    ('author_client', 'patch', REVIEW_DETAIL_URL, {'score': 3}, 5),
+    ('admin_client', 'delete', REVIEW_DETAIL_URL, None, 7),
+    ('client', 'get', COMMENTS_URL, None, 3),
+    ('client', 'get', COMMENT_DETAIL_URL, None, 1),
+    ('admin_client', 'post', COMMENTS_URL, {'text': 'text'}, 3),
+    ('author_client', 'patch', COMMENT_DETAIL_URL, {'text': 'text'}, 3),
+    ('admin_client', 'delete', COMMENT_DETAIL_URL, None, 4),
+    ('admin_client', 'get', '/api/v1/users/', None, 3),
+    ('admin_client', 'post', '/api/v1/users/',
+     {'username': 'new', 'email': 'new@yamdb.fake'}, 4),
+    ('admin_client', 'get', '/api/v1/users/{username}/', None, 2),
+    ('admin_client', 'patch', '/api/v1/users/{username}/', {'bio': 'bio'}, 3),
+    ('admin_client', 'delete', '/api/v1/users/{username}/', None, 14),
+    ('admin_client', 'get', '/api/v1/users/me/', None, 1),
+    ('admin_client', 'patch', '/api/v1/users/me/', {'bio': 'bio'}, 2),
+    ('client', 'post', '/api/v1/auth/signup/',
+     {'username': 'new', 'email': 'new@yamdb.fake'}, 2),
+    ('client', 'post', '/api/v1/auth/token/',
+     {'username': '{username}', 'confirmation_code': '{code}'}, 1),
+)
+
+
+def format_data(data, catalogue):
+    return {
+        key: value.format(**catalogue) if isinstance(value, str) else value
+        for key, value in data.items()
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    @pytest.mark.parametrize(
+        'client_name, method, url, data, expected_queries', QUERY_BUDGETS
+    )
+    def test_01_endpoint_query_budget(self, request, catalogue, client_name,
+                                      method, url, data, expected_queries):
+        client = request.getfixturevalue(client_name)
+        url = url.format(**catalogue)
+        if isinstance(data, dict):
+            data = format_data(data, catalogue)
+        elif data:
+            data = [format_data(item, catalogue) for item in data]
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(url, data=data, format='json')
+            if response.streaming:
+                b''.join(response.streaming_content)
+        assert response.status_code < 400, (
+            f'{method.upper()}-запрос к `{url}` вернул ответ со статусом '
+            f'{response.status_code}.'
+        )
+        queries = '\n'.join(
+            query['sql'] for query in context.captured_queries
+        )
+        assert len(context) == expected_queries, (
+            f'{method.upper()}-запрос к `{url}` выполнил {len(context)} '
+            f'запросов к базе данных вместо {expected_queries}:\n{queries}'
+        )
+
+    @pytest.mark.parametrize('url', (
+        REVIEW_DETAIL_URL, COMMENTS_URL, COMMENT_DETAIL_URL,
+    ))
+    def test_02_foreign_parent_not_found(self, client, catalogue, url):
+        other_title = Title.objects.exclude(pk=catalogue['title']).first()
+        url = url.format(**{**catalogue, 'title': other_title.pk})
+        response = client.get(url)
+        assert response.status_code == 404, (
+            f'Проверьте, что GET-запрос к `{url}` с отзывом другого '
+            'произведения возвращает ответ со статусом 404.'
+        )
+
+    @pytest.mark.parametrize('url', (TITLES_URL, REVIEWS_URL, COMMENTS_URL))
+    def test_03_list_queries_independent_of_page_size(self, client,
+                                                      catalogue, url):
+        url = url.format(**catalogue)
+        counts = []
+        for limit in (1, OBJECTS_COUNT):
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url, {'limit': limit})
+            assert len(response.json()['results']) == limit
+            counts.append(len(context))
+        assert counts[0] == counts[1], (
+            f'Количество запросов к базе данных при GET-запросе к `{url}` '
+            f'зависит от размера страницы: {counts[0]} для одного объекта '
+            f'и {counts[1]} для {OBJECTS_COUNT}.'
+        )
@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Review, Title
+
+OBJECTS_COUNT = 25
+TIED_TITLES_COUNT = 1300
+
+
+@pytest.fixture
+def titles(django_user_model):
+    category = Category.objects.create(name='Фильм', slug='films')
+    titles = [
+        Title.objects.create(
+            name=f'Произведение {idx}', year=2000 + idx % 3,
+            category=category,
+        ) for idx in range(OBJECTS_COUNT)
+    ]
+    for idx in range(OBJECTS_COUNT):
+        Review.objects.create(
+            title=titles[0], text='text', score=5,
+            author=django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            ),
+        )
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def walk_pages(self, client, url, link='next'):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Ответ в курсорном режиме пагинации не должен содержать '
+                'ключ `count`.'
+            )
+            page_ids = [item['id'] for item in data['results']]
+            ids = ids + page_ids if link == 'next' else page_ids + ids
+            url = data[link]
+        return ids
+
+    def get_offset_ids(self, client, url):
+        response = client.get(url, {'limit': OBJECTS_COUNT})
+        return [item['id'] for item in response.json()['results']]
+
+    @pytest.mark.parametrize('url', (TITLES_URL, REVIEWS_URL_TEMPLATE))
+    def test_01_cursor_walk_matches_offset_order(self, client, titles, url):
+        url = url.format(title_id=titles[0].pk)
+        ids = self.walk_pages(client, f'{url}?pagination=cursor')
+        assert ids == self.get_offset_ids(client, url), (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все '
+            'объекты в порядке сортировки модели.'
+        )
+
+    def test_02_cursor_mode_skips_count(self, client, titles):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL, {'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.OK
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        )
+        assert set(response.json()) == {'next', 'previous', 'results'}
+
+    def test_03_offset_mode_is_default(self, client, titles):
+        response = client.get(self.TITLES_URL)
+        assert response.json()['count'] == OBJECTS_COUNT
+
+    def test_04_invalid_cursor(self, client, titles):
+        response = client.get(self.TITLES_URL, {'cursor': 'invalid'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_many_titles_with_same_year(self, client):
+        category = Category.objects.create(name='Фильм', slug='films')
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx:04}', year=2000, category=category)
+            for idx in range(TIED_TITLES_COUNT)
+        )
+        expected = list(Title.objects.values_list('id', flat=True))
+        ids = self.walk_pages(
+            client, f'{self.TITLES_URL}?pagination=cursor&limit=100'
+        )
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация возвращает каждое '
+            'произведение один раз, даже если у многих совпадает год.'
+        )
+        last_page = client.get(
+            self.TITLES_URL, {'pagination': 'cursor', 'limit': 100}
+        ).json()
+        while last_page['next']:
+            last_page = client.get(last_page['next']).json()
+        ids = self.walk_pages(client, last_page['previous'], 'previous')
+        assert ids + [item['id'] for item in last_page['results']] == (
+            expected
+        ), 'Проверьте переход по ссылкам `previous` курсорной пагинации.'
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Title
+
+
+@pytest.fixture
+def claims_auth(settings):
+    settings.JWT_CLAIMS_AUTH = True
+
+
+def get_claims_client(user):
+    response = APIClient().post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == HTTPStatus.OK
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}')
+    return client
+
+
+def count_user_queries(context):
+    return sum(
+        'FROM "reviews_user"' in query['sql']
+        for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ClaimsAuthentication:
+
+    def test_01_no_user_query(self, claims_auth, admin):
+        client = get_claims_client(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK
+        assert count_user_queries(context) == 2, (
+            'Пользователь из токена не должен загружаться из базы данных.'
+        )
+
+    def test_02_disabled_by_default(self, admin):
+        client = get_claims_client(admin)
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/users/')
+        assert count_user_queries(context) == 3
+
+    def test_03_role_change_revokes_claims(self, claims_auth, admin,
+                                           user):
+        user_client = get_claims_client(user)
+        response = user_client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        user.role = 'admin'
+        user.save()
+        response = user_client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения роли пользователя права '
+            'определяются по данным из базы данных.'
+        )
+
+        admin.role = 'user'
+        admin.save()
+        response = get_claims_client(admin).get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_04_claims_user_writes(self, claims_auth, user):
+        title = Title.objects.create(
+            name='Произведение', year=2000,
+            category=Category.objects.create(name='Фильм', slug='films'),
+        )
+        client = get_claims_client(user)
+        response = client.post(
+            f'/api/v1/titles/{title.pk}/reviews/',
+            data={'text': 'text', 'score': 5},
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+
+        response = client.patch('/api/v1/users/me/', data={'bio': 'new'})
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert (user.bio, user.email) == ('new', 'testuser@yamdb.fake')
+
+    def test_05_bulk_change_revokes_claims(self, claims_auth, admin,
+                                           tmp_path):
+        client = get_claims_client(admin)
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK
+        path = tmp_path / 'users.csv'
+        path.write_text(
+            'id,username,email,role\n'
+            f'{admin.pk},{admin.username},{admin.email},user\n',
+            encoding='utf-8',
+        )
+        call_command('load_csv', str(path), upsert=True, stdout=StringIO())
+        response = client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что массовое изменение пользователей отзывает данные '
+            'выпущенных токенов.'
+        )
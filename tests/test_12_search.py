@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12FullTextSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def search_titles(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_title_search(self, admin_client, client):
+        create_titles(admin_client)
+        assert self.search_titles(client, 'термин') == ['Терминатор'], (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}?search=` '
+            'находит произведения по началу слова в названии.'
+        )
+        assert self.search_titles(client, 'yippie') == ['Крепкий орешек'], (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}?search=` '
+            'находит произведения по описанию.'
+        )
+        assert self.search_titles(client, 'нет такого') == []
+        assert self.search_titles(client, '"*:(') == []
+
+    def test_02_title_search_ranking(self, admin_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        for name, description in (
+            ('Матрица', 'Нео и матрица матрица'),
+            ('Документалка', 'Про съемки фильма матрица'),
+        ):
+            admin_client.post(self.TITLES_URL, data={
+                'name': name, 'year': 1999, 'description': description,
+                'genre': [genres[0]['slug']],
+                'category': categories[0]['slug'],
+            })
+        assert self.search_titles(client, 'матрица') == [
+            'Матрица', 'Документалка'
+        ]
+
+    def test_03_index_follows_changes(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        admin_client.patch(url, data={'name': 'Робокоп'})
+        assert self.search_titles(client, 'терминатор') == []
+        assert self.search_titles(client, 'робокоп') == ['Робокоп']
+
+        admin_client.delete(url)
+        assert self.search_titles(client, 'робокоп') == []
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/categories/', '/api/v1/genres/'
+    ))
+    def test_04_name_slug_search(self, admin_client, client, url):
+        create_titles(admin_client)
+        response = client.get(url)
+        name = response.json()['results'][0]['name']
+        response = client.get(url, {'search': name[:3].lower()})
+        assert [item['name'] for item in response.json()['results']] == [
+            name
+        ]
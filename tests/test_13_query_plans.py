@@ -0,0 +1,98 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+FULL_SCAN_PATTERN = re.compile(r'^SCAN (\S+)$')
+SORT_PATTERN = re.compile(r'USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY')
+COUNT_PATTERN = re.compile(r'^SELECT COUNT\(\*\)')
+
+LIST_URLS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/?year=2001',
+    '/api/v1/titles/?category=cat-1',
+    '/api/v1/titles/?pagination=cursor',
+    '/api/v1/categories/',
+    '/api/v1/genres/',
+    '/api/v1/users/',
+    '/api/v1/titles/{title}/reviews/',
+    '/api/v1/titles/{title}/reviews/?pagination=cursor',
+    '/api/v1/titles/{title}/reviews/{review}/comments/',
+)
+FILTER_URLS = (
+    '/api/v1/titles/?genre=genre-1',
+    '/api/v1/titles/?search=Произведение',
+    '/api/v1/titles/{title}/',
+    '/api/v1/titles/{title}/reviews/{review}/',
+    '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/',
+    '/api/v1/users/{username}/',
+)
+
+
+def get_query_plans(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+            yield query['sql'], [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Планы запросов SQLite.'
+)
+@pytest.mark.django_db(transaction=True)
+class Test13QueryPlans:
+
+    @pytest.mark.parametrize('url', LIST_URLS + FILTER_URLS)
+    def test_01_no_full_scans(self, admin_client, catalogue, url):
+        url = url.format(**catalogue)
+        for sql, plan in get_query_plans(admin_client, url):
+            scans = [step for step in plan if FULL_SCAN_PATTERN.match(step)]
+            assert not scans, (
+                f'GET-запрос к `{url}` читает таблицу целиком без индекса: '
+                f'{scans}\n{sql}'
+            )
+
+    @pytest.mark.parametrize('url', LIST_URLS)
+    def test_02_page_order_from_index(self, admin_client, catalogue, url):
+        url = url.format(**catalogue)
+        for sql, plan in get_query_plans(admin_client, url):
+            if 'LIMIT' not in sql or COUNT_PATTERN.match(sql):
+                continue
+            assert not any(SORT_PATTERN.search(step) for step in plan), (
+                f'Страница GET-запроса к `{url}` сортируется без индекса: '
+                f'{plan}\n{sql}'
+            )
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='Планы запросов PostgreSQL.'
+)
+@pytest.mark.django_db(transaction=True)
+class Test13PostgresSearchPlans:
+
+    @pytest.mark.parametrize('url, index', (
+        ('/api/v1/titles/?search=Произведение', 'reviews_title_fts'),
+        ('/api/v1/categories/?search=Категория', 'reviews_category_fts'),
+        ('/api/v1/genres/?search=Жанр', 'reviews_genre_fts'),
+    ))
+    def test_01_search_uses_index(self, admin_client, catalogue, url, index):
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+        assert response.status_code == 200
+        sql = next(
+            query['sql'] for query in context.captured_queries
+            if 'to_tsvector' in query['sql'] and 'LIMIT' in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}')
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+            cursor.execute('RESET enable_seqscan')
+        assert index in plan, (
+            f'Поиск GET-запроса к `{url}` не использует индекс {index}:\n'
+            f'{plan}'
+        )
@@ -0,0 +1,369 @@
+import csv
+import json
+import os
+import shutil
+import threading
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.management.commands.load_csv import (
+    DEFAULT_CSV_FOLDER_PATH, FILES_MODELS, REJECTS_SUFFIX, Checkpoint, Command
+)
+from reviews.models import (
+    Category, LoadCheckpoint, Review, Title, TitleSearchIndex, User
+)
+
+
+def count_csv_rows(file_name):
+    with open(
+        os.path.join(DEFAULT_CSV_FOLDER_PATH, file_name), encoding='utf-8'
+    ) as csv_file:
+        return sum(1 for _ in csv.reader(csv_file)) - 1
+
+
+def read_csv(file_name):
+    with open(
+        os.path.join(DEFAULT_CSV_FOLDER_PATH, file_name), encoding='utf-8'
+    ) as csv_file:
+        return list(csv.reader(csv_file))
+
+
+def write_csv(path, rows):
+    with open(path, mode='w', encoding='utf-8', newline='') as csv_file:
+        csv.writer(csv_file).writerows(rows)
+    return str(path)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14LoadCsv:
+
+    def test_01_load_default_files_in_batches(self):
+        call_command('load_csv', batch_size=7, stdout=StringIO())
+        for file_name, model in FILES_MODELS.items():
+            assert model.objects.count() == count_csv_rows(file_name), (
+                f'Проверьте, что команда load_csv загружает все записи '
+                f'файла {file_name} при загрузке пачками.'
+            )
+        title = Title.objects.filter(reviews__isnull=False).first()
+        scores = list(
+            Review.objects.filter(title=title).values_list('score', flat=True)
+        )
+        assert title.rating == sum(scores) // len(scores), (
+            'Проверьте, что после загрузки отзывов пересчитывается рейтинг '
+            'произведений.'
+        )
+
+    def test_02_progress_report(self):
+        stdout = StringIO()
+        call_command(
+            'load_csv', 'category.csv', batch_size=1, verbosity=2,
+            stdout=stdout
+        )
+        output = stdout.getvalue()
+        assert 'записей/с' in output, (
+            'Проверьте, что команда load_csv сообщает скорость загрузки.'
+        )
+        assert output.count('Category:') == count_csv_rows('category.csv'), (
+            'Проверьте, что при verbosity 2 команда load_csv сообщает о '
+            'каждой загруженной пачке.'
+        )
+
+    def test_03_dangling_relation(self, tmp_path):
+        call_command('load_csv', 'category.csv', stdout=StringIO())
+        path = write_csv(
+            tmp_path / 'titles.csv',
+            [('id', 'name', 'year', 'category'), (1, 'Фильм', 2000, 100500)]
+        )
+        with pytest.raises(CommandError, match='отклонено записей: 1'):
+            call_command('load_csv', path, stdout=StringIO())
+        assert not Title.objects.exists(), (
+            'Проверьте, что команда load_csv не создает записи со ссылками '
+            'на несуществующие объекты.'
+        )
+
+    def test_04_invalid_batch_size(self):
+        with pytest.raises(CommandError):
+            call_command('load_csv', batch_size=0, stdout=StringIO())
+
+    def test_05_stages_follow_dependencies(self):
+        command = Command()
+        stages = [
+            [os.path.basename(path) for path, _ in stage]
+            for stage in command.get_stages(command.get_default_csv_files())
+        ]
+        assert stages == [
+            ['users.csv', 'category.csv', 'genre.csv'],
+            ['titles.csv'],
+            ['genre_title.csv', 'review.csv'],
+            ['comments.csv'],
+        ], (
+            'Проверьте, что load_csv объединяет в этап файлы, не зависящие '
+            'друг от друга, и загружает их после файлов, на которые они '
+            'ссылаются.'
+        )
+
+    def test_06_parallel_load(self):
+        stdout = StringIO()
+        call_command('load_csv', workers=4, stdout=stdout)
+        for file_name, model in FILES_MODELS.items():
+            assert model.objects.count() == count_csv_rows(file_name), (
+                f'Проверьте, что команда load_csv с несколькими потоками '
+                f'загружает все записи файла {file_name}.'
+            )
+        assert stdout.getvalue().count('Этап') == 4, (
+            'Проверьте, что команда load_csv сообщает время каждого этапа.'
+        )
+
+    def test_07_upsert_unchanged_files(self):
+        call_command('load_csv', stdout=StringIO())
+        stdout = StringIO()
+        call_command('load_csv', upsert=True, stdout=stdout)
+        output = stdout.getvalue()
+        assert output.count('добавлено 0, изменено 0') == len(FILES_MODELS), (
+            'Проверьте, что load_csv --upsert не записывает в базу записи, '
+            'которые не изменились.'
+        )
+        assert 'удалено 0' in output
+        _, review = read_csv('review.csv')[:2]
+        assert Review.objects.get(pk=review[0]).pub_date.isoformat().startswith(
+            review[-1][:19]
+        ), (
+            'Проверьте, что load_csv сохраняет дату публикации из файла.'
+        )
+
+    def test_08_upsert_delta(self, tmp_path):
+        call_command('load_csv', stdout=StringIO())
+        header, first, *rows = read_csv('titles.csv')
+        reviews_count = Review.objects.filter(title_id=first[0]).count()
+        first[1] = 'Побег'
+        new_id = str(Title.objects.order_by('-pk').first().pk + 1)
+        path = write_csv(
+            tmp_path / 'titles.csv',
+            [header, first, *rows[:-1], (new_id, 'Новинка', 2020, 1)]
+        )
+        stdout = StringIO()
+        call_command('load_csv', path, upsert=True, stdout=stdout)
+        assert (
+            f'добавлено 1, изменено 1, без изменений {len(rows) - 1}, '
+            'удалено 1.'
+        ) in stdout.getvalue(), (
+            'Проверьте, что load_csv --upsert сообщает количество добавленных, '
+            'измененных, неизмененных и удаленных записей.'
+        )
+        assert Title.objects.get(pk=first[0]).name == 'Побег'
+        assert not Title.objects.filter(pk=rows[-1][0]).exists()
+        assert Title.objects.filter(pk=new_id).exists()
+        assert Review.objects.filter(title_id=first[0]).count() == (
+            reviews_count
+        ), (
+            'Проверьте, что load_csv --upsert не удаляет отзывы неизмененных '
+            'произведений.'
+        )
+        assert list(
+            TitleSearchIndex.objects.filter(document__match='Побег')
+            .values_list('pk', flat=True)
+        ) == [int(first[0])], (
+            'Проверьте, что после load_csv --upsert обновляется поисковый '
+            'индекс.'
+        )
+
+    def test_09_resume_after_crash(self, tmp_path, monkeypatch):
+        paths = [
+            shutil.copy(os.path.join(DEFAULT_CSV_FOLDER_PATH, name), tmp_path)
+            for name in FILES_MODELS
+        ]
+        insert_batch = Command.insert_batch
+        saved_batches = []
+
+        def crashing_insert_batch(command, model, *args):
+            if model is Review and len(saved_batches) == 2:
+                raise RuntimeError('Сбой загрузки')
+            if model is Review:
+                saved_batches.append(model)
+            insert_batch(command, model, *args)
+
+        monkeypatch.setattr(Command, 'insert_batch', crashing_insert_batch)
+        with pytest.raises(RuntimeError):
+            call_command('load_csv', *paths, batch_size=5, stdout=StringIO())
+        assert Review.objects.count() == 10
+        assert LoadCheckpoint.objects.get(
+            path=os.path.join(tmp_path, 'review.csv')
+        ).row == 10, (
+            'Проверьте, что load_csv сохраняет прогресс загрузки файла.'
+        )
+
+        monkeypatch.setattr(Command, 'insert_batch', insert_batch)
+        stdout = StringIO()
+        call_command(
+            'load_csv', *paths, batch_size=5, resume=True, stdout=stdout
+        )
+        output = stdout.getvalue()
+        assert 'продолжение загрузки после записи 10' in output, (
+            'Проверьте, что load_csv --resume продолжает загрузку с '
+            'последней сохраненной пачки.'
+        )
+        assert 'users.csv уже загружен' in output, (
+            'Проверьте, что load_csv --resume не загружает повторно '
+            'полностью загруженные файлы.'
+        )
+        for file_name, model in FILES_MODELS.items():
+            assert model.objects.count() == count_csv_rows(file_name), (
+                f'Проверьте, что после load_csv --resume загружены все '
+                f'записи файла {file_name}.'
+            )
+        assert not LoadCheckpoint.objects.exists(), (
+            'Проверьте, что после успешной загрузки прогресс удаляется.'
+        )
+        assert Title.objects.filter(rating__isnull=False).exists()
+
+    def test_10_rejects_before_writing(self, tmp_path):
+        call_command('load_csv', stdout=StringIO())
+        reviews_count = Review.objects.count()
+        header, first, *rows = read_csv('review.csv')
+        duplicate = [str(len(rows) + 10), *first[1:]]
+        out_of_range = [str(len(rows) + 11), *rows[0][1:4], '11', rows[0][5]]
+        dangling = [str(len(rows) + 12), '100500', *rows[1][2:]]
+        path = write_csv(
+            tmp_path / 'review.csv',
+            [header, first, *rows, duplicate, out_of_range, dangling]
+        )
+        with pytest.raises(CommandError, match='отклонено записей: 3'):
+            call_command('load_csv', path, batch_size=7, stdout=StringIO())
+        assert Review.objects.count() == reviews_count, (
+            'Проверьте, что load_csv не изменяет базу, если в файле есть '
+            'ошибки.'
+        )
+        with open(path + REJECTS_SUFFIX, encoding='utf-8') as rejects_file:
+            rejects = [json.loads(line) for line in rejects_file]
+        assert [
+            (reject['row'], reject['column']) for reject in rejects
+        ] == [
+            (len(rows) + 2, 'title, author'),
+            (len(rows) + 3, 'score'),
+            (len(rows) + 4, 'title'),
+        ], (
+            'Проверьте, что load_csv записывает номера и колонки отклоненных '
+            'записей в файл отклоненных записей.'
+        )
+
+    def test_11_rejects_future_year_and_unknown_role(self, tmp_path):
+        titles = write_csv(
+            tmp_path / 'titles.csv',
+            [('id', 'name', 'year', 'category'), (1, 'Фильм', 3000, '')]
+        )
+        with pytest.raises(CommandError):
+            call_command('load_csv', titles, stdout=StringIO())
+        with open(titles + REJECTS_SUFFIX, encoding='utf-8') as rejects_file:
+            assert json.loads(rejects_file.readline())['column'] == 'year', (
+                'Проверьте, что load_csv отклоняет произведения с годом '
+                'больше текущего.'
+            )
+        users = write_csv(
+            tmp_path / 'users.csv',
+            [('id', 'username', 'email', 'role'), (1, 'u', 'u@u.ru', 'king')]
+        )
+        with pytest.raises(CommandError):
+            call_command('load_csv', users, stdout=StringIO())
+
+    def test_12_upsert_rekeyed_unique_values(self, tmp_path):
+        call_command('load_csv', stdout=StringIO())
+        header, first, *rows = read_csv('users.csv')
+        new_id = str(max(int(row[0]) for row in [first, *rows]) + 1)
+        path = write_csv(
+            tmp_path / 'users.csv', [header, [new_id, *first[1:]], *rows]
+        )
+        stdout = StringIO()
+        call_command('load_csv', path, upsert=True, stdout=stdout)
+        assert 'добавлено 1' in stdout.getvalue() and (
+            'удалено 1' in stdout.getvalue()
+        ), (
+            'Проверьте, что load_csv --upsert загружает запись с новым id '
+            'и прежними уникальными значениями.'
+        )
+        assert User.objects.get(username=first[1]).pk == int(new_id)
+
+    def test_13_upsert_unique_conflict_before_writing(self, tmp_path):
+        call_command('load_csv', stdout=StringIO())
+        header, first, second, *rows = read_csv('category.csv')
+        new_id = str(max(int(row[0]) for row in [first, second, *rows]) + 1)
+        path = write_csv(tmp_path / 'category.csv', [
+            header, [first[0], first[1], 'new-slug'],
+            [second[0], second[1], 'other-slug'],
+            [new_id, 'Новая', second[2]], *rows,
+        ])
+        with pytest.raises(CommandError, match='отклонено записей: 1'):
+            call_command('load_csv', path, upsert=True, stdout=StringIO())
+        assert Category.objects.get(pk=first[0]).slug == first[2], (
+            'Проверьте, что load_csv --upsert проверяет уникальные значения '
+            'по базе до записи.'
+        )
+        with open(path + REJECTS_SUFFIX, encoding='utf-8') as rejects_file:
+            reject = json.loads(rejects_file.readline())
+        assert (reject['row'], reject['column']) == (3, 'slug')
+
+    def test_14_resume_after_crash_on_checkpoint(self, tmp_path,
+                                                  monkeypatch):
+        paths = [
+            shutil.copy(os.path.join(DEFAULT_CSV_FOLDER_PATH, name), tmp_path)
+            for name in FILES_MODELS
+        ]
+        save = Checkpoint.save
+        saved_rows = []
+
+        def crashing_save(checkpoint, row, done=False):
+            if checkpoint.path.endswith('review.csv') and len(saved_rows) == 2:
+                raise RuntimeError('Сбой загрузки')
+            if checkpoint.path.endswith('review.csv'):
+                saved_rows.append(row)
+            save(checkpoint, row, done)
+
+        monkeypatch.setattr(Checkpoint, 'save', crashing_save)
+        with pytest.raises(RuntimeError):
+            call_command('load_csv', *paths, batch_size=5, stdout=StringIO())
+        assert Review.objects.count() == 10, (
+            'Проверьте, что пачка и прогресс загрузки сохраняются в одной '
+            'транзакции.'
+        )
+
+        monkeypatch.setattr(Checkpoint, 'save', save)
+        call_command(
+            'load_csv', *paths, batch_size=5, resume=True, stdout=StringIO()
+        )
+        assert Review.objects.count() == count_csv_rows('review.csv'), (
+            'Проверьте, что load_csv --resume продолжает загрузку после '
+            'сбоя при сохранении прогресса.'
+        )
+
+    def test_15_upsert_unchanged_skips_refresh(self):
+        call_command('load_csv', stdout=StringIO())
+        stdout = StringIO()
+        call_command('load_csv', upsert=True, stdout=stdout)
+        assert 'Пересчет рейтинга' not in stdout.getvalue(), (
+            'Проверьте, что load_csv --upsert без изменений не пересчитывает '
+            'рейтинг.'
+        )
+
+    def test_16_parallel_validation(self, monkeypatch):
+        validate_file = Command.validate_file
+        threads = {}
+
+        def recording_validate_file(command, csv_file_path, *args):
+            threads[os.path.basename(csv_file_path)] = (
+                threading.current_thread()
+            )
+            validate_file(command, csv_file_path, *args)
+
+        monkeypatch.setattr(Command, 'validate_file', recording_validate_file)
+        command = Command()
+        call_command(command, workers=4, stdout=StringIO())
+        assert threading.main_thread() not in {
+            threads[name] for name in ('users.csv', 'category.csv')
+        }, (
+            'Проверьте, что load_csv проверяет файлы этапа в пуле потоков.'
+        )
+        assert command.file_ids == {}, (
+            'Проверьте, что load_csv не хранит id записей файлов, на которые '
+            'не ссылаются следующие этапы.'
+        )
@@ -0,0 +1,102 @@
+import gzip
+import json
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from django.utils import timezone
+
+from reviews.management.commands.load_csv import FILES_MODELS
+from reviews.models import Review, Title, User
+
+
+def get_table_data():
+    return {
+        file_name: list(model.objects.order_by('pk').values_list())
+        for file_name, model in FILES_MODELS.items()
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15DumpCsv:
+
+    @pytest.mark.parametrize('gzip_output', (False, True))
+    def test_01_round_trip(self, tmp_path, gzip_output):
+        call_command('load_csv', stdout=StringIO())
+        title = Title.objects.first()
+        title.description = 'Строка, "кавычки"\r\nи перевод строки'
+        title.save()
+        staff, inactive = User.objects.order_by('pk')[:2]
+        User.objects.filter(pk=staff.pk).update(
+            is_staff=True, is_superuser=True, last_login=timezone.now()
+        )
+        staff.set_password('1234567')
+        staff.save(update_fields=('password',))
+        User.objects.filter(pk=inactive.pk).update(is_active=False)
+        expected = get_table_data()
+        ratings = list(Title.objects.order_by('pk').values_list('rating'))
+
+        call_command(
+            'dump_csv', str(tmp_path), gzip=gzip_output, stdout=StringIO()
+        )
+        suffix = '.gz' if gzip_output else ''
+        paths = [
+            os.path.join(tmp_path, file_name + suffix)
+            for file_name in FILES_MODELS
+        ]
+        Review.objects.all().delete()
+        Title.objects.all().delete()
+        User.objects.all().delete()
+        call_command('load_csv', *paths, stdout=StringIO())
+
+        assert get_table_data() == expected, (
+            'Проверьте, что данные, выгруженные командой dump_csv и '
+            'загруженные командой load_csv, совпадают с исходными.'
+        )
+        assert list(
+            Title.objects.order_by('pk').values_list('rating')
+        ) == ratings
+        assert User.objects.get(pk=staff.pk).is_admin, (
+            'Проверьте, что dump_csv выгружает флаги is_staff и '
+            'is_superuser пользователей.'
+        )
+        assert not User.objects.get(pk=inactive.pk).is_active
+        assert User.objects.get(pk=staff.pk).check_password('1234567'), (
+            'Проверьте, что dump_csv выгружает пароли пользователей.'
+        )
+
+    def test_02_ndjson(self, tmp_path):
+        call_command('load_csv', stdout=StringIO())
+        call_command(
+            'dump_csv', str(tmp_path), 'review.csv', format='ndjson',
+            gzip=True, workers=1, stdout=StringIO()
+        )
+        assert os.listdir(tmp_path) == ['review.ndjson.gz'], (
+            'Проверьте, что dump_csv выгружает только указанные файлы.'
+        )
+        with gzip.open(
+            os.path.join(tmp_path, 'review.ndjson.gz'), mode='rt',
+            encoding='utf-8'
+        ) as ndjson_file:
+            rows = [json.loads(line) for line in ndjson_file]
+        review = Review.objects.order_by('pk').first()
+        assert len(rows) == Review.objects.count()
+        assert rows[0] == {
+            'id': review.pk,
+            'title_id': review.title_id,
+            'text': review.text,
+            'author': review.author_id,
+            'score': review.score,
+            'pub_date': review.pub_date.isoformat(),
+        }, (
+            'Проверьте, что dump_csv --format ndjson выгружает записи в виде '
+            'JSON объектов с колонками файлов load_csv.'
+        )
+
+    def test_03_unknown_file(self, tmp_path):
+        with pytest.raises(CommandError):
+            call_command('dump_csv', str(tmp_path), 'posts.csv')
+        with pytest.raises(CommandError):
+            call_command('dump_csv', str(tmp_path / 'missing'))
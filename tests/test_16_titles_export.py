@@ -0,0 +1,78 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import export
+from reviews.models import Category, Genre, Title
+from tests.fixtures.fixture_catalogue import OBJECTS_COUNT
+
+EXPORT_URL = '/api/v1/titles/export/'
+
+
+def read_lines(response):
+    content = b''.join(response.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitlesExport:
+
+    def test_01_admin_only(self, catalogue, client, user_client):
+        assert client.get(EXPORT_URL).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(EXPORT_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), (
+            'Проверьте, что выгрузка произведений доступна только '
+            'администратору.'
+        )
+
+    def test_02_titles_match_api(self, catalogue, admin_client):
+        response = admin_client.get(EXPORT_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка произведений отдается потоком.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        titles = read_lines(response)
+        api_titles = admin_client.get(
+            '/api/v1/titles/', {'limit': OBJECTS_COUNT}
+        ).json()['results']
+        assert titles == sorted(api_titles, key=lambda title: title['id']), (
+            'Проверьте, что выгрузка содержит все произведения с теми же '
+            'полями, жанрами, категорией и рейтингом, что и API.'
+        )
+
+    def test_03_queries_per_chunk(self, catalogue, admin_client,
+                                  monkeypatch):
+        monkeypatch.setattr(export, 'EXPORT_CHUNK_SIZE', 5)
+        response = admin_client.get(EXPORT_URL)
+        with CaptureQueriesContext(connection) as context:
+            titles = read_lines(response)
+        assert len(titles) == OBJECTS_COUNT
+        chunks = -(-OBJECTS_COUNT // 5)
+        assert len(context) == 2 + chunks * 2 + 1, (
+            'Проверьте, что выгрузка делает два запроса на пачку '
+            'произведений и не делает запросов на каждое произведение.'
+        )
+
+    def test_04_objects_created_during_export(self, catalogue, admin_client,
+                                              monkeypatch):
+        monkeypatch.setattr(export, 'EXPORT_CHUNK_SIZE', 5)
+        response = admin_client.get(EXPORT_URL)
+        content = iter(response.streaming_content)
+        first_chunk = next(content)
+        title = Title.objects.order_by('pk').last()
+        title.category = Category.objects.create(name='Новая', slug='new')
+        title.save()
+        title.genre.add(Genre.objects.create(name='Новый', slug='new'))
+        content = (first_chunk + b''.join(content)).decode()
+        titles = [json.loads(line) for line in content.splitlines()]
+        assert len(titles) == OBJECTS_COUNT, (
+            'Проверьте, что выгрузка не прерывается, если во время нее '
+            'созданы категории и жанры.'
+        )
+        assert titles[-1]['category'] == {'name': 'Новая', 'slug': 'new'}
+        assert {'name': 'Новый', 'slug': 'new'} in titles[-1]['genre']
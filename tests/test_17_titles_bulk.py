@@ -0,0 +1,151 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+
+BULK_URL = '/api/v1/titles/bulk/'
+
+
+def make_titles(count, genre=('genre-0', 'genre-1'), category='cat-0'):
+    return [
+        {
+            'name': f'Массовое {idx}', 'year': 2000 + idx,
+            'genre': list(genre), 'category': category,
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitlesBulk:
+
+    def test_01_admin_only(self, catalogue, user_client):
+        response = user_client.post(BULK_URL, make_titles(1), format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что массовая запись произведений доступна только '
+            'администратору.'
+        )
+
+    def test_02_create_and_update(self, catalogue, admin_client):
+        items = make_titles(2)
+        items.append({
+            'id': catalogue['title'], 'name': 'Измененное', 'year': 1999,
+            'genre': ['genre-5'], 'category': 'cat-5',
+        })
+        response = admin_client.post(BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            'created', 'created', 'updated'
+        ], (
+            'Проверьте, что массовая запись возвращает результат для каждого '
+            'произведения.'
+        )
+        assert results[2]['id'] == catalogue['title']
+        for item, result in zip(items, results):
+            title = admin_client.get(
+                f'/api/v1/titles/{result["id"]}/'
+            ).json()
+            assert title['name'] == item['name']
+            assert [genre['slug'] for genre in title['genre']] == (
+                item['genre']
+            ), (
+                'Проверьте, что массовая запись сохраняет жанры произведений.'
+            )
+            assert title['category']['slug'] == item['category']
+        found = admin_client.get(
+            '/api/v1/titles/', {'search': 'Массовое'}
+        ).json()['results']
+        assert {title['id'] for title in found} == {
+            result['id'] for result in results[:2]
+        }, (
+            'Проверьте, что созданные массово произведения находятся поиском.'
+        )
+        assert Title.objects.get(pk=catalogue['title']).rating == 5, (
+            'Проверьте, что изменение произведения не сбрасывает его рейтинг.'
+        )
+
+    def test_03_atomic_by_default(self, catalogue, admin_client):
+        items = make_titles(3)
+        items[1]['genre'] = ['genre-0', 'unknown']
+        items[2]['year'] = 3000
+        count = Title.objects.count()
+        response = admin_client.post(BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert Title.objects.count() == count, (
+            'Проверьте, что при ошибке в одном произведении массовая запись '
+            'не сохраняет ни одного.'
+        )
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            'skipped', 'invalid', 'invalid'
+        ]
+        assert 'genre' in results[1]['errors']
+        assert 'year' in results[2]['errors']
+
+    def test_04_partial_success(self, catalogue, admin_client):
+        items = make_titles(3)
+        items[1]['category'] = 'unknown'
+        count = Title.objects.count()
+        response = admin_client.post(
+            BULK_URL + '?partial_success=true', items, format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert [result['status'] for result in response.json()] == [
+            'created', 'invalid', 'created'
+        ]
+        assert Title.objects.count() == count + 2, (
+            'Проверьте, что с partial_success=true сохраняются корректные '
+            'произведения.'
+        )
+
+    def test_05_queries_do_not_depend_on_size(self, catalogue, admin_client):
+        query_counts = []
+        for count in (2, 20):
+            items = make_titles(count)
+            items.append({
+                'id': catalogue['title'], 'name': 'Измененное', 'year': 1999,
+                'genre': ['genre-5'], 'category': 'cat-5',
+            })
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(BULK_URL, items, format='json')
+            assert response.status_code == HTTPStatus.OK
+            query_counts.append(len(context))
+        assert query_counts[0] == query_counts[1], (
+            'Проверьте, что количество запросов массовой записи не зависит '
+            'от количества произведений.'
+        )
+
+    def test_06_not_list(self, catalogue, admin_client):
+        response = admin_client.post(
+            BULK_URL, make_titles(1)[0], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    @pytest.mark.parametrize('partial_success', (False, True))
+    def test_07_duplicate_ids(self, catalogue, admin_client, partial_success):
+        item = {
+            'id': catalogue['title'], 'name': 'Измененное', 'year': 1999,
+            'genre': ['genre-5'], 'category': 'cat-5',
+        }
+        response = admin_client.post(
+            BULK_URL + ('?partial_success=true' if partial_success else ''),
+            [item, dict(item, name='Другое')], format='json'
+        )
+        results = response.json()
+        assert results[1]['status'] == 'invalid', (
+            'Проверьте, что повторное изменение произведения в одном '
+            'запросе отмечается ошибкой.'
+        )
+        assert 'id' in results[1]['errors']
+        title = Title.objects.get(pk=catalogue['title'])
+        if partial_success:
+            assert response.status_code == HTTPStatus.OK
+            assert results[0]['status'] == 'updated'
+            assert title.name == 'Измененное'
+        else:
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            assert title.name != 'Измененное'
@@ -0,0 +1,161 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+from reviews import slug_cache as slug_cache_module
+from reviews.slug_cache import NAME_SLUG_CACHES, NameSlugCache
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def invalidate_caches():
+    for model_cache in NAME_SLUG_CACHES.values():
+        model_cache.invalidate()
+
+
+@pytest.fixture
+def slug_cache(settings):
+    settings.NAME_SLUG_CACHE = True
+    invalidate_caches()
+    yield
+    invalidate_caches()
+
+
+def count_slug_lookups(context):
+    return sum(
+        f'WHERE "{table}"."slug"' in query['sql']
+        for query in context.captured_queries
+        for table in ('reviews_category', 'reviews_genre')
+    )
+
+
+def get_title_data(**kwargs):
+    data = {
+        'name': 'Новое', 'year': 2000,
+        'genre': ['genre-0', 'genre-1'], 'category': 'cat-0',
+    }
+    data.update(kwargs)
+    return data
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18SlugCache:
+
+    def test_01_same_titles_list(self, catalogue, client, settings):
+        expected = client.get(TITLES_URL).json()
+        settings.NAME_SLUG_CACHE = True
+        invalidate_caches()
+        try:
+            assert client.get(TITLES_URL).json() == expected, (
+                'Проверьте, что кеш слагов не меняет список произведений.'
+            )
+            assert client.get(
+                TITLES_URL, {'genre': 'genre-1', 'category': 'cat-1'}
+            ).json()['count'] == 1
+            assert client.get(
+                TITLES_URL, {'genre': 'unknown'}
+            ).json()['count'] == 0, (
+                'Проверьте, что фильтр по неизвестному слагу ничего '
+                'не находит.'
+            )
+        finally:
+            invalidate_caches()
+
+    def test_02_no_category_and_genre_queries(self, catalogue, slug_cache,
+                                              admin_client):
+        admin_client.get(TITLES_URL)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                TITLES_URL, data=get_title_data(), format='json'
+            )
+            admin_client.get(TITLES_URL, {'category': 'cat-0'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['category'] == {
+            'name': 'Категория 0', 'slug': 'cat-0'
+        }
+        assert count_slug_lookups(context) == 0, (
+            'Проверьте, что при включенном кеше слагов категории и жанры '
+            'не ищутся по слагу в базе данных.'
+        )
+        assert not any(
+            'JOIN "reviews_category"' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что при включенном кеше слагов произведения не '
+            'соединяются с таблицей категорий.'
+        )
+
+    def test_03_invalidated_on_change(self, catalogue, slug_cache,
+                                      admin_client):
+        admin_client.get(TITLES_URL)
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Новая', 'slug': 'new'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        response = admin_client.post(
+            TITLES_URL, data=get_title_data(category='new'), format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что кеш слагов сбрасывается при создании категории.'
+        )
+        Genre.objects.filter(slug='genre-1').delete()
+        Genre.objects.get(slug='genre-0').delete()
+        response = admin_client.post(
+            TITLES_URL, data=get_title_data(), format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что кеш слагов сбрасывается при удалении жанра.'
+        )
+
+    def test_04_shared_between_processes(self, catalogue, slug_cache):
+        other_process_cache = NameSlugCache(Category)
+        assert other_process_cache.get_id('cat-0') == (
+            Category.objects.get(slug='cat-0').pk
+        )
+        Category.objects.filter(slug='cat-0').update(slug='renamed')
+        other_process_cache.refresh()
+        assert other_process_cache.get_id('renamed') is None
+        Category.objects.get(slug='renamed').save()
+        other_process_cache.refresh()
+        assert other_process_cache.get_id('renamed') is not None, (
+            'Проверьте, что изменение категории сбрасывает кеш слагов '
+            'других процессов через кеш Django.'
+        )
+
+    def test_05_bulk_uses_cache(self, catalogue, slug_cache, admin_client):
+        admin_client.get(TITLES_URL, {'genre': 'genre-0'})
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                '/api/v1/titles/bulk/', [get_title_data()], format='json'
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert Title.objects.filter(name='Новое').exists()
+        assert not any(
+            'FROM "reviews_genre"' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что массовая запись определяет жанры по кешу слагов.'
+        )
+
+    def test_06_version_checked_once_per_request(self, catalogue, slug_cache,
+                                                 client, monkeypatch):
+        client.get(TITLES_URL)
+        calls = []
+
+        class RecordingCache:
+            def __getattr__(self, name):
+                calls.append(name)
+                return getattr(cache, name)
+
+        monkeypatch.setattr(slug_cache_module, 'cache', RecordingCache())
+        response = client.get(TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) > 1
+        assert calls == ['get_many'], (
+            'Проверьте, что версия кеша слагов проверяется один раз за '
+            'запрос, а не для каждого произведения.'
+        )
@@ -0,0 +1,110 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Genre
+
+TITLES_URL = '/api/v1/titles/'
+CATEGORIES_URL = '/api/v1/categories/'
+
+
+@pytest.fixture
+def response_cache(settings):
+    settings.RESPONSE_CACHE = 'default'
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def count_queries(client, url, **params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    assert response.status_code == HTTPStatus.OK
+    return len(context.captured_queries), response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ResponseCache:
+
+    def test_01_cached_lists(self, catalogue, response_cache, client):
+        for url in (CATEGORIES_URL, '/api/v1/genres/', TITLES_URL):
+            _, expected = count_queries(client, url, limit=5, offset=2)
+            queries, data = count_queries(client, url, offset=2, limit=5)
+            assert queries == 0, (
+                f'Проверьте, что повторный запрос {url} отдается из кеша '
+                f'без запросов к базе данных.'
+            )
+            assert data == expected
+
+    def test_02_disabled_by_default(self, catalogue, client):
+        count_queries(client, CATEGORIES_URL)
+        queries, _ = count_queries(client, CATEGORIES_URL)
+        assert queries > 0
+
+    def test_03_titles_cached_for_anonymous_only(self, catalogue,
+                                                 response_cache,
+                                                 admin_client):
+        count_queries(admin_client, TITLES_URL)
+        queries, _ = count_queries(admin_client, TITLES_URL)
+        assert queries > 0, (
+            'Проверьте, что произведения кешируются только для анонимных '
+            'пользователей.'
+        )
+        count_queries(admin_client, CATEGORIES_URL)
+        with CaptureQueriesContext(connection) as context:
+            admin_client.get(CATEGORIES_URL)
+        assert not any(
+            'reviews_category' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что список категорий кешируется и для '
+            'аутентифицированных пользователей.'
+        )
+
+    def test_04_review_updates_rating(self, catalogue, response_cache,
+                                      client, admin_client):
+        url = f'{TITLES_URL}{catalogue["title"]}/'
+        _, title = count_queries(client, url)
+        assert title['rating'] == 5
+        response = admin_client.post(
+            f'{url}reviews/', data={'text': 'Плохо', 'score': 1}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        _, title = count_queries(client, url)
+        assert title['rating'] == 4, (
+            'Проверьте, что после нового отзыва кешированный рейтинг '
+            'произведения не отдается.'
+        )
+
+    def test_05_catalogue_writes_invalidate(self, catalogue, response_cache,
+                                            client, admin_client):
+        _, categories = count_queries(client, CATEGORIES_URL)
+        admin_client.post(CATEGORIES_URL, data={'name': 'Новая', 'slug': 'new'})
+        _, data = count_queries(client, CATEGORIES_URL)
+        assert data['count'] == categories['count'] + 1, (
+            'Проверьте, что создание категории сбрасывает кеш категорий.'
+        )
+        _, titles = count_queries(client, TITLES_URL, name='Произведение 0')
+        Genre.objects.filter(slug='genre-0').update(name='Переименованный')
+        Genre.objects.get(slug='genre-0').save()
+        _, data = count_queries(client, TITLES_URL, name='Произведение 0')
+        assert data['results'][0]['genre'] != titles['results'][0]['genre'], (
+            'Проверьте, что изменение жанра сбрасывает кеш произведений.'
+        )
+
+    def test_06_bulk_write_invalidates(self, catalogue, response_cache,
+                                       client, admin_client):
+        _, titles = count_queries(client, TITLES_URL)
+        response = admin_client.post('/api/v1/titles/bulk/', [{
+            'name': 'Массовое', 'year': 2000,
+            'genre': ['genre-0'], 'category': 'cat-0',
+        }], format='json')
+        assert response.status_code == HTTPStatus.OK
+        _, data = count_queries(client, TITLES_URL)
+        assert data['count'] == titles['count'] + 1, (
+            'Проверьте, что массовая запись произведений сбрасывает кеш '
+            'произведений.'
+        )
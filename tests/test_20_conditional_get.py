@@ -0,0 +1,154 @@
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import caching
+from reviews.models import Category, Comment, User
+
+CATEGORIES_URL = '/api/v1/categories/'
+
+
+@pytest.fixture
+def conditional_get(settings):
+    settings.CONDITIONAL_GET = True
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1_000_000.2)
+    monkeypatch.setattr(
+        caching, 'time', SimpleNamespace(time=lambda: clock.now)
+    )
+    return clock
+
+
+def get_reviews_url(catalogue):
+    return f'/api/v1/titles/{catalogue["title"]}/reviews/'
+
+
+def get_comments_url(catalogue):
+    return f'{get_reviews_url(catalogue)}{catalogue["review"]}/comments/'
+
+
+def poll(client, url, etag):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ConditionalGet:
+
+    def test_01_disabled_by_default(self, catalogue, client):
+        response = client.get(CATEGORIES_URL)
+        assert not response.has_header('ETag')
+
+    def test_02_not_modified_without_queries(self, catalogue,
+                                             conditional_get, client):
+        for url in (
+            CATEGORIES_URL, '/api/v1/genres/', '/api/v1/titles/',
+            f'/api/v1/titles/{catalogue["title"]}/',
+            get_reviews_url(catalogue), get_comments_url(catalogue),
+        ):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.has_header('ETag'), (
+                f'Проверьте, что ответ {url} содержит ETag.'
+            )
+            response, queries = poll(client, url, response['ETag'])
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что запрос {url} с совпадающим If-None-Match '
+                f'получает ответ 304.'
+            )
+            assert queries == 0, (
+                f'Проверьте, что ответ 304 на запрос {url} не обращается '
+                f'к базе данных.'
+            )
+
+    def test_03_if_modified_since(self, catalogue, conditional_get, client,
+                                  clock):
+        response = client.get(CATEGORIES_URL)
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что ресурс, измененный в текущую секунду, не '
+            'получает Last-Modified.'
+        )
+        clock.now += 1
+        response = client.get(CATEGORIES_URL)
+        last_modified = response['Last-Modified']
+        response = client.get(
+            CATEGORIES_URL, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        clock.now += 0.5
+        Category.objects.create(name='Новая', slug='new')
+        response = client.get(
+            CATEGORIES_URL, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение в ту же секунду, что и прошлый ответ, '
+            'не дает ответ 304 по If-Modified-Since.'
+        )
+        assert not response.has_header('Last-Modified')
+
+    def test_04_review_thread_poll(self, catalogue, conditional_get,
+                                   user_client, admin_client):
+        url = get_reviews_url(catalogue)
+        etag = user_client.get(url)['ETag']
+        response, queries = poll(user_client, url, etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert queries == 1, (
+            'Проверьте, что опрос отзывов без изменений выполняет только '
+            'запрос пользователя.'
+        )
+        admin_client.post(url, data={'text': 'Новый', 'score': 3})
+        response, _ = poll(user_client, url, etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет ETag отзывов произведения.'
+        )
+        title_url = f'/api/v1/titles/{catalogue["title"]}/'
+        title_etag = user_client.get(title_url)['ETag']
+        admin_client.post(
+            get_comments_url(catalogue), data={'text': 'Комментарий'}
+        )
+        response, _ = poll(user_client, title_url, title_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что комментарий не меняет ETag произведения.'
+        )
+
+    def test_05_comment_delete_and_author_rename(self, catalogue,
+                                                 conditional_get,
+                                                 admin_client):
+        url = get_comments_url(catalogue)
+        response = admin_client.get(url)
+        comment_id = response.json()['results'][0]['id']
+        etag = response['ETag']
+        admin_client.delete(f'{url}{comment_id}/')
+        response, _ = poll(admin_client, url, etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что удаление комментария меняет ETag комментариев.'
+        )
+        reviews_url = get_reviews_url(catalogue)
+        etag = admin_client.get(reviews_url)['ETag']
+        User.objects.filter(username=catalogue['username']).first().save()
+        response, _ = poll(admin_client, reviews_url, etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение автора меняет ETag отзывов.'
+        )
+
+    def test_06_comment_deleted_outside_api(self, catalogue,
+                                            conditional_get, client):
+        url = get_comments_url(catalogue)
+        etag = client.get(url)['ETag']
+        Comment.objects.filter(review_id=catalogue['review']).first().delete()
+        response, _ = poll(client, url, etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что удаление комментария вне API меняет ETag '
+            'комментариев.'
+        )
@@ -0,0 +1,102 @@
+import re
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+from reviews.models import OutboxEmail
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture
+def email_outbox(settings):
+    settings.EMAIL_OUTBOX = True
+
+
+def signup(client, idx):
+    response = client.post(SIGNUP_URL, data={
+        'username': f'user{idx}', 'email': f'user{idx}@yamdb.fake'
+    })
+    assert response.status_code == 200
+    return response
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21EmailOutbox:
+
+    def test_01_signup_enqueues(self, email_outbox, client):
+        signup(client, 0)
+        signup(client, 0)
+        assert not mail.outbox, (
+            'Проверьте, что при включенной очереди писем регистрация '
+            'не отправляет письмо.'
+        )
+        assert OutboxEmail.objects.count() == 1, (
+            'Проверьте, что повторная регистрация не добавляет второе '
+            'письмо в очередь.'
+        )
+
+    def test_02_worker_sends_with_one_connection(self, email_outbox, client,
+                                                 monkeypatch):
+        for idx in range(5):
+            signup(client, idx)
+        opened = []
+        monkeypatch.setattr(
+            EmailBackend, 'open', lambda backend: opened.append(backend)
+        )
+        stdout = StringIO()
+        call_command('send_emails', batch_size=2, stdout=stdout)
+        assert 'Отправлено писем: 5, отложено: 0.' in stdout.getvalue()
+        assert len(mail.outbox) == 5
+        assert len(opened) == 1, (
+            'Проверьте, что команда send_emails отправляет все пачки писем '
+            'через одно соединение.'
+        )
+        assert not OutboxEmail.objects.exists()
+        code = re.search(
+            r'Код подтверждения: (\S+)', mail.outbox[0].body
+        ).group(1)
+        response = client.post(TOKEN_URL, data={
+            'username': 'user0', 'confirmation_code': code
+        })
+        assert response.status_code == 200, (
+            'Проверьте, что письмо из очереди содержит действующий код '
+            'подтверждения.'
+        )
+
+    def test_03_failed_emails_retry_later(self, email_outbox, client,
+                                          monkeypatch):
+        for idx in range(3):
+            signup(client, idx)
+        send_messages = EmailBackend.send_messages
+
+        def failing_send_messages(backend, messages):
+            if 'user1@yamdb.fake' in messages[0].to:
+                raise ConnectionError('Сервер недоступен')
+            return send_messages(backend, messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', failing_send_messages)
+        stdout = StringIO()
+        call_command('send_emails', stdout=stdout)
+        call_command('send_emails', stdout=stdout)
+        assert 'Отправлено писем: 2, отложено: 1.' in stdout.getvalue()
+        assert 'Отправлено писем: 0, отложено: 0.' in stdout.getvalue(), (
+            'Проверьте, что неотправленное письмо откладывается на время '
+            'перед следующей попыткой.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 1
+        assert 'Сервер недоступен' in email.last_error
+
+        email.next_attempt = email.next_attempt.replace(year=2000)
+        email.save()
+        call_command('send_emails', max_attempts=2, stdout=StringIO())
+        email.refresh_from_db()
+        assert email.next_attempt is None, (
+            'Проверьте, что после --max-attempts попыток письмо больше '
+            'не отправляется.'
+        )
@@ -0,0 +1,69 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+
+from api import utils
+
+SUBJECT = 'Регистрация в сервисе YaMDB.'
+
+
+@pytest.fixture
+def users(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'user{idx}', email=f'user{idx}@yamdb.fake'
+        ) for idx in range(5)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22BulkEmails:
+
+    def test_01_subject_rendered(self, client):
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'user', 'email': 'user@yamdb.fake'
+        })
+        assert mail.outbox[0].subject == SUBJECT, (
+            'Проверьте, что тема письма подтверждения берется из шаблона, '
+            'а не из его имени.'
+        )
+
+    def test_02_bulk_send(self, users, monkeypatch):
+        opened = []
+        monkeypatch.setattr(
+            EmailBackend, 'open', lambda backend: opened.append(backend)
+        )
+        sent = utils.send_confirmation_emails(users, chunk_size=2)
+        assert sent == len(users)
+        assert [message.to for message in mail.outbox] == [
+            [user.email] for user in users
+        ]
+        assert len(opened) == 1, (
+            'Проверьте, что send_confirmation_emails отправляет все письма '
+            'через одно соединение.'
+        )
+        assert all(message.subject == SUBJECT for message in mail.outbox)
+        code = mail.outbox[0].body.split('Код подтверждения: ')[1].split()[0]
+        assert default_token_generator.check_token(users[0], code)
+
+    def test_03_templates_compiled_once(self, users, monkeypatch):
+        compiled = []
+        get_template = utils.get_template
+
+        def counting_get_template(name):
+            compiled.append(name)
+            return get_template(name)
+
+        monkeypatch.setattr(utils, 'get_template', counting_get_template)
+        utils.get_email_template.cache_clear()
+        try:
+            utils.send_confirmation_emails(users)
+        finally:
+            utils.get_email_template.cache_clear()
+        assert sorted(compiled) == sorted((
+            utils.CONFIRMATION_EMAIL_BODY, utils.CONFIRMATION_EMAIL_SUBJECT
+        )), (
+            'Проверьте, что шаблоны письма загружаются один раз для всех '
+            'писем.'
+        )
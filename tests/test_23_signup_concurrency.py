@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from threading import Lock
+
+import pytest
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import User
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+USERS_COUNT = 100
+REPEATS = 3
+WORKERS = 16
+# Тестовая база SQLite в памяти с общим кешем не ждет снятия блокировок
+# таблиц: чтение выполняется без блокировок, а запись - по очереди,
+# как в файловой базе с busy_timeout.
+database_lock = Lock()
+
+
+def locked_query(execute, sql, params, many, context):
+    with database_lock:
+        return execute(sql, params, many, context)
+
+
+def signup(data):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA read_uncommitted = 1')
+        with connection.execute_wrapper(locked_query):
+            return APIClient().post(SIGNUP_URL, data=data).status_code
+    finally:
+        connection.close()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23SignupConcurrency:
+
+    def test_01_conflicts_reported_deterministically(self, client):
+        client.post(SIGNUP_URL, data={'username': 'a', 'email': 'a@a.ru'})
+        client.post(SIGNUP_URL, data={'username': 'b', 'email': 'b@b.ru'})
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                SIGNUP_URL, data={'username': 'a', 'email': 'b@b.ru'}
+            )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert list(response.json()) == ['username', 'email'], (
+            'Проверьте, что регистрация сообщает обо всех занятых полях '
+            'в одном порядке.'
+        )
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что занятые логин и email ищутся одним запросом.'
+        )
+
+    def test_02_parallel_signups(self):
+        requests = [
+            {'username': f'user{idx}', 'email': f'user{idx}@yamdb.fake'}
+            for idx in range(USERS_COUNT)
+        ] * REPEATS
+        conflicts = [
+            {'username': f'user{idx}', 'email': f'other{idx}@yamdb.fake'}
+            for idx in range(USERS_COUNT)
+        ]
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            statuses = list(executor.map(signup, requests + conflicts))
+        assert statuses[:len(requests)] == [HTTPStatus.OK] * len(requests), (
+            'Проверьте, что параллельные повторные регистрации одного '
+            'пользователя завершаются успешно.'
+        )
+        assert set(statuses[len(requests):]) == {HTTPStatus.BAD_REQUEST}, (
+            'Проверьте, что регистрация с занятым логином отклоняется.'
+        )
+        assert User.objects.count() == USERS_COUNT
+        assert len(mail.outbox) == len(requests)
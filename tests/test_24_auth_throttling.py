@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.throttling import (
+    MemoryBucketStorage, TokenBucketThrottle, memory_storage
+)
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture
+def auth_rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'auth_ip': '5/min',
+            'auth_username': '3/min',
+        },
+    }
+    memory_storage.clear()
+    cache.clear()
+    yield
+    memory_storage.clear()
+    cache.clear()
+
+
+def get_token(client, username, ip='10.0.0.1'):
+    return client.post(TOKEN_URL, data={
+        'username': username, 'confirmation_code': 'wrong'
+    }, REMOTE_ADDR=ip)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24AuthThrottling:
+
+    def test_01_disabled_by_default(self, client):
+        for idx in range(10):
+            response = get_token(client, f'user{idx}')
+            assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('storage', (None, 'default'))
+    def test_02_limit_by_ip(self, auth_rates, settings, client, storage):
+        settings.THROTTLE_CACHE = storage
+        for idx in range(5):
+            response = client.post(SIGNUP_URL, data={
+                'username': f'user{idx}', 'email': f'user{idx}@yamdb.fake'
+            })
+            assert response.status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(SIGNUP_URL, data={
+                'username': 'user5', 'email': 'user5@yamdb.fake'
+            })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что регистрация ограничена по IP.'
+        )
+        assert response.has_header('Retry-After')
+        assert not context.captured_queries, (
+            'Проверьте, что отклоненный запрос не обращается к базе данных.'
+        )
+        response = client.post(SIGNUP_URL, data={
+            'username': 'user5', 'email': 'user5@yamdb.fake'
+        }, REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_forwarded_for_ignored(self, auth_rates, client):
+        statuses = [
+            client.post(SIGNUP_URL, data={
+                'username': f'user{idx}', 'email': f'user{idx}@yamdb.fake'
+            }, HTTP_X_FORWARDED_FOR=f'10.1.0.{idx}').status_code
+            for idx in range(6)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подделанный заголовок X-Forwarded-For не '
+            'позволяет обойти ограничение по IP.'
+        )
+
+    def test_04_trusted_proxy(self, auth_rates, settings, client):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK, 'NUM_PROXIES': 1
+        }
+        for idx in range(6):
+            response = client.post(SIGNUP_URL, data={
+                'username': f'user{idx}', 'email': f'user{idx}@yamdb.fake'
+            }, HTTP_X_FORWARDED_FOR=f'10.1.0.{idx}, 10.2.0.1')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что за прокси IP клиента берется из адреса, '
+            'добавленного доверенным прокси.'
+        )
+
+    def test_05_limit_by_username(self, auth_rates, user, client):
+        for idx in range(3):
+            response = get_token(client, user.username, ip=f'10.0.1.{idx}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = get_token(client, user.username, ip='10.0.1.100')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что получение токена ограничено по логину '
+            'независимо от IP.'
+        )
+        response = get_token(client, 'other', ip='10.0.1.100')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_06_tokens_refill(self, auth_rates, client, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(TokenBucketThrottle, 'timer', lambda self: now)
+        for _ in range(3):
+            get_token(client, 'user')
+        assert get_token(client, 'user').status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+        now += 20
+        assert get_token(client, 'user').status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что запросы снова разрешаются после восстановления '
+            'токенов.'
+        )
+
+    def test_07_memory_storage_size(self):
+        storage = MemoryBucketStorage(size=2)
+        for key in ('a', 'b', 'c'):
+            storage.consume(key, 1, 1, 0)
+        assert list(storage.buckets) == ['b', 'c']
+        assert storage.consume('b', 1, 1, 0) == 1
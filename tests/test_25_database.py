@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from reviews.database import close_if_unusable
+
+WAL_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+}
+
+
+@pytest.fixture
+def file_connection(tmp_path):
+    wrapper = DatabaseWrapper({
+        **connection.settings_dict, 'NAME': str(tmp_path / 'db.sqlite3')
+    }, alias='file')
+    yield wrapper
+    wrapper.close()
+
+
+def get_pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Database:
+
+    def test_01_default_pragmas(self, settings, file_connection):
+        settings.SQLITE_PRAGMAS = {}
+        assert get_pragma(file_connection, 'journal_mode') == 'delete', (
+            'Проверьте, что без SQLITE_PRAGMAS режим журнала не меняется.'
+        )
+
+    def test_02_pragmas_on_connect(self, settings, file_connection):
+        settings.SQLITE_PRAGMAS = WAL_PRAGMAS
+        assert get_pragma(file_connection, 'journal_mode') == 'wal', (
+            'Проверьте, что SQLITE_PRAGMAS выполняются для нового '
+            'соединения.'
+        )
+        assert get_pragma(file_connection, 'busy_timeout') == 5000
+        assert get_pragma(file_connection, 'synchronous') == 1
+
+    def test_03_health_checks(self, file_connection, monkeypatch):
+        file_connection.ensure_connection()
+        monkeypatch.setattr(file_connection, 'is_usable', lambda: False)
+        file_connection.settings_dict['CONN_HEALTH_CHECKS'] = False
+        close_if_unusable(file_connection)
+        assert file_connection.connection is not None, (
+            'Проверьте, что без CONN_HEALTH_CHECKS соединение не проверяется.'
+        )
+        file_connection.settings_dict['CONN_HEALTH_CHECKS'] = True
+        close_if_unusable(file_connection)
+        assert file_connection.connection is None, (
+            'Проверьте, что неработающее соединение закрывается.'
+        )
+
+    def test_04_requests_with_health_checks(self, client, monkeypatch):
+        monkeypatch.setitem(connection.settings_dict, 'CONN_MAX_AGE', 60)
+        monkeypatch.setitem(
+            connection.settings_dict, 'CONN_HEALTH_CHECKS', True
+        )
+        for _ in range(2):
+            response = client.get('/api/v1/titles/')
+            assert response.status_code == HTTPStatus.OK